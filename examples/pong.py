@@ -1,6 +1,6 @@
 import random
 import pyxel
-from pytaon import Space, AABB
+from pytaon import Space, Body
 
 
 # Constantes
@@ -12,14 +12,18 @@ dt = 1 / FPS
 
 # Elementos dinâmicos
 h = 8
-space = Space(margin_top=90, margin_bottom=0)
-player1 = space.add_aabb(5, 45 - h, 8, 45 + h, color=pyxel.COLOR_WHITE)
-player2 = space.add_aabb(112, 45 - h, 115, 45 + h, color=pyxel.COLOR_WHITE)
+space = Space()
+player1 = space.add_aabb(
+    5, 45 - h, 8, 45 + h, color=pyxel.COLOR_WHITE, body_type=Body.KINEMATIC
+)
+player2 = space.add_aabb(
+    112, 45 - h, 115, 45 + h, color=pyxel.COLOR_WHITE, body_type=Body.KINEMATIC
+)
 ball = space.add_aabb(58, 43, 62, 47, color=pyxel.COLOR_RED)
 
 # Margens
-# margin_bottom = space.add_aabb(0, 90, 120, 100, mass="inf", gravity=(0, 0))
-# margin_top = space.add_aabb(0, -10, 120, 0, mass="inf", gravity=(0, 0))
+margin_bottom = space.add_aabb(0, 90, 120, 100, body_type=Body.STATIC)
+margin_top = space.add_aabb(0, -10, 120, 0, body_type=Body.STATIC)
 
 
 def update():
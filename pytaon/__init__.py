@@ -3,14 +3,21 @@ Physics module for the Pyxel engine.
 """
 __version__ = "0.0.2b"
 
-import pyxel as _pyxel
+from . import backend as _pyxel
 from .body import Body
 from .circle import Circle
 from .aabb import AABB
 from .segment import Segment
 from .poly import Poly
 from .space import Space
+from .particles import ParticleSystem
+from .batch import SpaceBatch
+from .partition import PartitionedSpace
+from .ensemble import Ensemble
+from .recorder import TrajectoryRecorder, Trajectory
+from .frames import Frame
 from .collision import Collision
+from .query import SegmentQueryInfo
 from .vec2d import Vec2d, VecLike, asvec2d
 from .mat2 import Mat2, MatLike, asmat2
 from .transform import Transform, astransform
@@ -36,9 +43,10 @@ def run(*args, background=_pyxel.COLOR_BLACK):
     """
     if len(args) == 1:
         (sp,) = args
+        dt = globals()["dt"]
 
         def update():
-            sp.step(globals()["dt"])
+            sp.step(dt)
 
         def draw():
             if background is not None:
@@ -61,16 +69,53 @@ def __getattr__(attr):
     __getattr__ é chamando sempre que o usuário pedir um símbolo
     que não existe no módulo pytaon. Isto permite calcular valores
     em tempo de execução.
+
+    Constantes e funções do Pyxel são resolvidas uma única vez e
+    passam a ser globais comuns do módulo. As coordenadas dos vetores
+    calculados são reaproveitadas entre chamadas, mas cada acesso
+    retorna um novo vetor, que pode ser modificado livremente.
+
+    Nomes privados e especiais (como __all__, consultado por
+    "from pytaon import *") não são repassados ao Pyxel, para que
+    não o importem.
     """
-    try:
-        return globals()[f"_{attr}_"]()
-    except KeyError:
-        return getattr(_pyxel, attr)
+    if attr.startswith("_"):
+        raise AttributeError(f"module 'pytaon' has no attribute {attr!r}")
+    compute = _computed.get(attr)
+    if compute is not None:
+        return compute()
+    value = getattr(_pyxel, attr)
+    if callable(value) or attr.isupper():
+        globals()[attr] = value
+    return value
+
+
+_middle_cache = (None, None)
+_mouse_pos_cache = (None, None)
 
 
 def _middle_():
-    return Vec2d(_pyxel.width / 2, _pyxel.height / 2)
+    # Recalculado apenas quando o tamanho da tela muda
+    global _middle_cache
+    pyxel = _pyxel.load()
+    size, value = _middle_cache
+    if size != (pyxel.width, pyxel.height):
+        size = (pyxel.width, pyxel.height)
+        value = (pyxel.width / 2, pyxel.height / 2)
+        _middle_cache = (size, value)
+    return Vec2d(*value)
 
 
 def _mouse_pos_():
-    return Vec2d(_pyxel.mouse_x / 2, _pyxel.mouse_y / 2)
+    # Recalculado apenas uma vez por frame
+    global _mouse_pos_cache
+    pyxel = _pyxel.load()
+    frame, value = _mouse_pos_cache
+    if frame != pyxel.frame_count:
+        frame = pyxel.frame_count
+        value = (pyxel.mouse_x / 2, pyxel.mouse_y / 2)
+        _mouse_pos_cache = (frame, value)
+    return Vec2d(*value)
+
+
+_computed = {"middle": _middle_, "mouse_pos": _mouse_pos_}
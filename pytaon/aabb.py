@@ -1,7 +1,8 @@
-import pyxel
-
+from . import backend as pyxel
 from .body import Body
 from .collision import Collision
+from .query import ray_rounded_poly, segment_query_result
+from .vec2d import Vec2d
 
 
 class AABB(Body):
@@ -52,6 +53,13 @@ class AABB(Body):
     def draw(self):
         pyxel.rect(self.left, self.bottom, self.width, self.height, self.color)
 
+    @classmethod
+    def draw_many(cls, bodies):
+        rect = pyxel.rect
+        for body in bodies:
+            left, bottom = body.left, body.bottom
+            rect(left, bottom, body.right - left, body.top - bottom, body.color)
+
     def update_position(self, dt):
         dx = self.velocity_x * dt
         dy = self.velocity_y * dt
@@ -60,6 +68,36 @@ class AABB(Body):
         self.bottom += dy
         self.top += dy
 
+    def contains_point(self, x, y):
+        return self.left <= x <= self.right and self.bottom <= y <= self.top
+
+    @classmethod
+    def contains_points(cls, bodies, xs, ys):
+        return [
+            body.left <= x <= body.right and body.bottom <= y <= body.top
+            for body, x, y in zip(bodies, xs, ys)
+        ]
+
+    def segment_query(self, a, b, radius=0.0):
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        left, bottom, right, top = self.left, self.bottom, self.right, self.top
+        vertices = [(right, bottom), (right, top), (left, top), (left, bottom)]
+        planes = [
+            (1.0, 0.0, right),
+            (0.0, 1.0, top),
+            (-1.0, 0.0, -left),
+            (0.0, -1.0, -bottom),
+        ]
+        hit = ray_rounded_poly(ax, ay, dx, dy, vertices, planes, radius)
+        return segment_query_result(self, ax, ay, dx, dy, hit)
+
+    def support(self, direction):
+        dx, dy = direction
+        x = self.right if dx >= 0 else self.left
+        y = self.top if dy >= 0 else self.bottom
+        return Vec2d(x, y)
+
     def get_collision(self, other):
         return other.get_collision_aabb(self)
 
@@ -76,3 +114,6 @@ class AABB(Body):
             else:
                 normal = (0, 1)
             return Collision(self, other, pos, normal)
+
+    def get_collision_poly(self, other):
+        return other.get_collision_aabb(self)
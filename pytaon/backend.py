@@ -0,0 +1,37 @@
+"""
+Acesso preguiçoso ao Pyxel, o backend de renderização.
+
+O módulo pyxel só é importado no primeiro acesso a um atributo que não esteja
+definido aqui (por exemplo, pyxel.circ em um método draw()). Desta forma, a
+simulação pode ser executada sem nenhum backend gráfico (modo headless).
+"""
+import importlib
+
+# Cores da paleta padrão do Pyxel, disponíveis sem importar o backend.
+COLOR_BLACK = 0
+COLOR_WHITE = 7
+COLOR_RED = 8
+
+_module = None
+
+
+def load():
+    """
+    Importa e retorna o módulo pyxel.
+    """
+    global _module
+    if _module is None:
+        _module = importlib.import_module("pyxel")
+    return _module
+
+
+def __getattr__(attr):
+    # Nomes privados e especiais não carregam o Pyxel.
+    if attr.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {attr!r}")
+    value = getattr(load(), attr)
+    # Funções são guardadas no módulo para acelerar os próximos acessos. Os
+    # demais atributos (width, frame_count, etc) mudam durante a execução.
+    if callable(value):
+        globals()[attr] = value
+    return value
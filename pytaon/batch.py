@@ -0,0 +1,186 @@
+"""
+Simulação paralela de vários espaços independentes em processos separados.
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+# Estado de cada processo de trabalho.
+_spaces = []
+_offsets = []
+_shm = None
+_view = None
+
+STATE_SIZE = 4
+
+
+class SpaceBatch:
+    """
+    Conjunto de espaços independentes simulados em paralelo.
+
+    Os espaços são criados dentro dos processos de trabalho por factory(i),
+    para i de 0 a n - 1, e permanecem nestes processos durante toda a vida do
+    lote. A factory deve ser uma função definida no nível de um módulo, para
+    que possa ser enviada aos processos.
+
+    O estado dos corpos (x, y, vx, vy, na ordem de space.bodies) é trocado
+    através de um bloco de memória compartilhada: os processos gravam o
+    estado ao final de cada chamada a step_all() e leem eventuais
+    modificações feitas com set_state() no início da chamada seguinte. O
+    número de corpos de cada espaço deve permanecer constante.
+
+    Cada processo é controlado por um executor próprio, de forma que os
+    espaços de um processo sempre são simulados por ele.
+    """
+
+    def __init__(self, factory, n, workers=None):
+        workers = min(n, workers or os.cpu_count() or 1)
+        # Os processos devem compartilhar o rastreador de recursos deste
+        # processo para que a memória compartilhada seja liberada uma única vez.
+        resource_tracker.ensure_running()
+        chunks = [range(n)[k::workers] for k in range(workers)]
+        self._executors = [ProcessPoolExecutor(max_workers=1) for _ in chunks]
+        self._chunks = chunks
+
+        # Cria espaços e reserva memória para o estado dos corpos.
+        counts = [0] * n
+        futures = [
+            executor.submit(_build, factory, chunk)
+            for executor, chunk in zip(self._executors, chunks)
+        ]
+        for chunk, future in zip(chunks, futures):
+            for i, count in zip(chunk, future.result()):
+                counts[i] = count
+
+        self._starts = starts = [0] * (n + 1)
+        for i, count in enumerate(counts):
+            starts[i + 1] = starts[i] + STATE_SIZE * count
+        self._shm = SharedMemory(create=True, size=8 * max(starts[-1], 1))
+        self._view = self._shm.buf.cast("d")
+        futures = [
+            executor.submit(_attach, self._shm.name, [starts[i] for i in chunk])
+            for executor, chunk in zip(self._executors, chunks)
+        ]
+        for future in futures:
+            future.result()
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _map(self, func, *args):
+        """
+        Executa func(*args) em todos os processos e retorna a lista de
+        resultados de cada um.
+        """
+        futures = [executor.submit(func, *args) for executor in self._executors]
+        return [future.result() for future in futures]
+
+    def step_all(self, dt, n=1):
+        """
+        Executa n passos de simulação de tamanho dt em todos os espaços.
+        """
+        self._map(_step, dt, n)
+
+    def gather(self, func, *args) -> list:
+        """
+        Retorna a lista com func(space, *args) para cada espaço do lote, na
+        ordem dos índices. A função é executada nos processos de trabalho e
+        deve estar definida no nível de um módulo.
+        """
+        result = [None] * len(self)
+        for chunk, values in zip(self._chunks, self._map(_gather, func, *args)):
+            for i, value in zip(chunk, values):
+                result[i] = value
+        return result
+
+    def state(self, i) -> array:
+        """
+        Retorna cópia do estado dos corpos do i-ésimo espaço no formato
+        [x0, y0, vx0, vy0, x1, y1, ...].
+        """
+        return array("d", self._view[self._starts[i] : self._starts[i + 1]])
+
+    def set_state(self, i, values):
+        """
+        Modifica o estado dos corpos do i-ésimo espaço. Os valores seguem o
+        formato de state() e são aplicados no próximo step_all().
+        """
+        self._view[self._starts[i] : self._starts[i + 1]] = array("d", values)
+
+    def close(self):
+        """
+        Encerra os processos e libera a memória compartilhada.
+        """
+        if self._shm is None:
+            return
+        self._map(_detach)
+        for executor in self._executors:
+            executor.shutdown()
+        self._view.release()
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+
+#
+# Funções executadas nos processos de trabalho
+#
+def _build(factory, indices):
+    global _spaces
+    _spaces = [factory(i) for i in indices]
+    return [len(space.bodies) for space in _spaces]
+
+
+def _attach(name, offsets):
+    global _shm, _view, _offsets
+    _shm = SharedMemory(name)
+    _view = _shm.buf.cast("d")
+    _offsets = offsets
+    _store()
+
+
+def _detach():
+    global _shm, _view
+    _view.release()
+    _shm.close()
+    _shm = _view = None
+
+
+def _store():
+    for space, start in zip(_spaces, _offsets):
+        values = array("d")
+        for body in space.bodies:
+            values.extend(
+                (body.position_x, body.position_y, body.velocity_x, body.velocity_y)
+            )
+        _view[start : start + len(values)] = values
+
+
+def _load():
+    for space, start in zip(_spaces, _offsets):
+        values = _view[start : start + STATE_SIZE * len(space.bodies)].tolist()
+        for k, body in enumerate(space.bodies):
+            x, y, vx, vy = values[STATE_SIZE * k : STATE_SIZE * (k + 1)]
+            if x != body.position_x or y != body.position_y:
+                body.position_x, body.position_y = x, y
+            body.velocity_x, body.velocity_y = vx, vy
+
+
+def _step(dt, n):
+    _load()
+    for space in _spaces:
+        for _ in range(n):
+            space.step(dt)
+    _store()
+
+
+def _gather(func, *args):
+    return [func(space, *args) for space in _spaces]
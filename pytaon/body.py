@@ -1,11 +1,16 @@
-import pyxel
 import random
 from math import sqrt
+from typing import List
 from functools import partial
 
+from . import backend as pyxel
 from .collision import Collision
+from .gjk import get_collision_gjk
+from .query import ray_circle, segment_query_result
 from .vec2d import Vec2d, asvec2d
 
+ALL_CATEGORIES = 0xFFFFFFFF
+
 
 class Body:
     """
@@ -13,8 +18,30 @@ class Body:
     definidas.
 
     Cada sub-classe de Body representa um tipo diferente de caixa de contorno.
+
+    A filtragem de colisões é controlada pelos atributos:
+
+    * group: corpos com o mesmo grupo (diferente de zero) nunca colidem.
+    * category: máscara de bits com as categorias às quais o corpo pertence.
+    * mask: máscara de bits com as categorias com as quais o corpo colide.
+
+    O tipo do corpo (body_type) define como o espaço o trata:
+
+    * Body.DYNAMIC: corpo comum, movido por forças e colisões.
+    * Body.KINEMATIC: corpo movido pelo usuário (diretamente ou pela
+      velocidade). Não sofre a ação de forças nem de colisões e não colide
+      com outros corpos cinemáticos ou estáticos.
+    * Body.STATIC: corpo que nunca se move, como paredes e chão. Não é
+      integrado e não colide com outros corpos estáticos ou cinemáticos.
+
+    O tipo deve ser definido antes de adicionar o corpo ao espaço.
     """
 
+    # Tipos de corpos
+    DYNAMIC = "dynamic"
+    KINEMATIC = "kinematic"
+    STATIC = "static"
+
     # Propriedades genéricas
     position: Vec2d = None
     velocity: Vec2d = None
@@ -67,28 +94,28 @@ class Body:
         """
         Coordenada x da margem direita do corpo.
         """
-        raise NotImplementedError
+        return self.position.x
 
     @property
     def left(self):
         """
         Coordenada x da margem esquerda do corpo.
         """
-        raise NotImplementedError
+        return self.position.x
 
     @property
     def top(self):
         """
         Coordenada y da margem superior do corpo.
         """
-        raise NotImplementedError
+        return self.position.y
 
     @property
     def bottom(self):
         """
         Coordenada y da margem inferior do corpo.
         """
-        raise NotImplementedError
+        return self.position.y
 
     @property
     def position_func(self):
@@ -134,7 +161,13 @@ class Body:
         force_func=None,
         position_func=None,
         velocity_func=None,
+        group=0,
+        category=ALL_CATEGORIES,
+        mask=ALL_CATEGORIES,
+        body_type=DYNAMIC,
     ):
+        if body_type not in (self.DYNAMIC, self.KINEMATIC, self.STATIC):
+            raise ValueError(f"tipo de corpo inválido: {body_type!r}")
         self.position = Vec2d(*pos)
         self.velocity = Vec2d(*vel)
         self.mass = float(mass)
@@ -146,6 +179,64 @@ class Body:
         self.force_func = force_func
         self.position_func = position_func
         self.velocity_func = velocity_func
+        self.group = group
+        self.category = category
+        self.mask = mask
+        self.body_type = body_type
+
+    def replicate(self, **columns) -> List["Body"]:
+        """
+        Cria cópias do corpo, uma para cada linha das sequências passadas
+        como argumentos nomeados. Cada argumento associa o nome de um atributo
+        a uma sequência com o valor do atributo em cada cópia. Os vetores
+        position e velocity podem ser dados como pares (x, y). Todas as
+        sequências devem ter o mesmo tamanho.
+
+        As cópias são criadas a partir dos atributos do corpo original, sem
+        executar __init__, o que torna a criação de muitos corpos muito mais
+        rápida que chamadas individuais ao construtor. Cada cópia recebe os
+        seus próprios vetores (como gravity), que podem ser modificados sem
+        afetar as demais.
+        """
+        if len({len(column) for column in columns.values()}) > 1:
+            raise ValueError("sequências de tamanhos diferentes")
+
+        cls = type(self)
+        new = object.__new__
+        vec = Vec2d
+        position_func, velocity_func = self._position_func, self._velocity_func
+        base = self.__dict__
+        names = tuple(columns)
+        vectors = [name for name in ("position", "velocity") if name in columns]
+        copied = [
+            name
+            for name, value in base.items()
+            if isinstance(value, vec) and name not in columns and name != "force"
+        ]
+
+        result = []
+        append = result.append
+        for row in zip(*columns.values()):
+            obj = new(cls)
+            attrs = obj.__dict__
+            attrs.update(base)
+            attrs.update(zip(names, row))
+            for name in vectors:
+                attrs[name] = vec(*attrs[name])
+            for name in copied:
+                v = attrs[name]
+                attrs[name] = vec(v.x, v.y)
+            attrs["force"] = vec(0, 0)
+            if callable(position_func):
+                attrs["_update_position_"] = partial(position_func, obj)
+            else:
+                attrs["_update_position_"] = obj.update_position
+            if callable(velocity_func):
+                attrs["_update_velocity_"] = partial(velocity_func, obj)
+            else:
+                attrs["_update_velocity_"] = obj.update_velocity
+            append(obj)
+        return result
 
     def apply_force(self, fx, fy=None):
         """
@@ -181,37 +272,90 @@ class Body:
         """
         pyxel.pset(*self.position, self.color)
 
+    @classmethod
+    def draw_many(cls, bodies):
+        """
+        Versão em lote de draw: desenha todos os corpos da sequência.
+
+        Todos os corpos devem ser da classe cls. Sub-classes sobrescrevem este
+        método com laços que chamam o Pyxel diretamente, sem uma chamada de
+        método por corpo.
+        """
+        for body in bodies:
+            body.draw()
+
+    def contains_point(self, x, y) -> bool:
+        """
+        Verifica se o ponto (x, y) está dentro da figura.
+        """
+        return x == self.position.x and y == self.position.y
+
+    @classmethod
+    def contains_points(cls, bodies, xs, ys) -> List[bool]:
+        """
+        Versão em lote de contains_point: verifica se cada ponto (xs[i], ys[i])
+        está dentro do corpo bodies[i].
+
+        Todos os corpos devem ser da classe cls. Sub-classes sobrescrevem este
+        método com laços especializados que evitam uma chamada de método por
+        ponto.
+        """
+        return [body.contains_point(x, y) for body, x, y in zip(bodies, xs, ys)]
+
+    def segment_query(self, a, b, radius=0.0) -> "SegmentQueryInfo":
+        """
+        Verifica se o segmento de a até b, engrossado pelo raio dado, toca a
+        figura e retorna um SegmentQueryInfo com o primeiro ponto de contato
+        ou None.
+        """
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        x, y = self.position.x, self.position.y
+        hit = ray_circle(ax, ay, dx, dy, x, y, radius)
+        return segment_query_result(self, ax, ay, dx, dy, hit)
+
+    def support(self, direction) -> Vec2d:
+        """
+        Retorna o ponto da figura mais distante na direção dada.
+
+        Utilizada pelos algoritmos genéricos de colisão (GJK/EPA), que funcionam
+        para qualquer par de figuras convexas que implementem este método.
+        """
+        return self.position
+
     #
     # Calcula colisões com outras figuras geométricas.
     #
+    # Por padrão, utiliza GJK/EPA. Sub-classes podem sobrescrever os métodos
+    # para pares que possuem uma rotina específica mais eficiente.
+    #
     def get_collision(self, other: "Body") -> "Collision":
         """
         Verifica se há colisão com outro objeto e retorna um objeto de colisão 
         ou None caso não exista superposição.
         """
-        msg = f"Colisão não implementada: {type(self)}, {type(other)}"
-        raise NotImplementedError(msg)
+        return get_collision_gjk(self, other)
 
     def get_collision_circle(self, other: "Circle"):
         """
         Verifica colisão com círculos.
         """
-        raise NotImplementedError("Implemente em sub-classe")
+        return get_collision_gjk(self, other)
 
     def get_collision_aabb(self, other):
         """
         Verifica colisão com AABBs.
         """
-        raise NotImplementedError("Implemente em sub-classe")
+        return get_collision_gjk(self, other)
 
     def get_collision_poly(self, other):
         """
         Verifica colisão com Polígonos.
         """
-        raise NotImplementedError("Implemente em sub-classe")
+        return get_collision_gjk(self, other)
 
     def get_collision_segment(self, other):
         """
         Verifica colisão com Pílulas.
         """
-        raise NotImplementedError("Implemente em sub-classe")
+        return get_collision_gjk(self, other)
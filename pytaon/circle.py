@@ -1,9 +1,10 @@
 from math import pi, sqrt
 
-import pyxel
-
+from . import backend as pyxel
 from .body import Body
 from .collision import Collision
+from .query import ray_circle, segment_query_result
+from .vec2d import Vec2d
 
 
 class Circle(Body):
@@ -27,6 +28,42 @@ class Circle(Body):
     def draw(self):
         pyxel.circ(*self.position, self.radius, self.color)
 
+    @classmethod
+    def draw_many(cls, bodies):
+        circ = pyxel.circ
+        for body in bodies:
+            pos = body.position
+            circ(pos.x, pos.y, body.radius, body.color)
+
+    def contains_point(self, x, y):
+        dx, dy = x - self.position.x, y - self.position.y
+        return dx * dx + dy * dy <= self.radius * self.radius
+
+    @classmethod
+    def contains_points(cls, bodies, xs, ys):
+        result = []
+        append = result.append
+        for body, x, y in zip(bodies, xs, ys):
+            pos, r = body.position, body.radius
+            dx, dy = x - pos.x, y - pos.y
+            append(dx * dx + dy * dy <= r * r)
+        return result
+
+    def segment_query(self, a, b, radius=0.0):
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        x, y = self.position.x, self.position.y
+        hit = ray_circle(ax, ay, dx, dy, x, y, self.radius + radius)
+        return segment_query_result(self, ax, ay, dx, dy, hit)
+
+    def support(self, direction):
+        dx, dy = direction
+        norm = sqrt(dx ** 2 + dy ** 2)
+        if norm == 0:
+            return Vec2d(self.position.x, self.position.y)
+        r = self.radius / norm
+        return Vec2d(self.position.x + r * dx, self.position.y + r * dy)
+
     def get_collision(self, other):
         return other.get_collision_circle(self)
 
@@ -38,3 +75,6 @@ class Circle(Body):
             return Collision(self, other, (0, 0), (0, 0))
         else:
             return None
+
+    def get_collision_poly(self, other):
+        return other.get_collision_circle(self)
@@ -1,38 +1,94 @@
-import pyxel
+import threading
+
+from . import backend as pyxel
+
+
+class _PoolState(threading.local):
+    # Pool utilizado para criar colisões durante um passo de simulação. Cada
+    # thread possui o seu, o que permite calcular colisões em paralelo.
+    pool = None
+
+
+_state = _PoolState()
 
 
 class Collision:
     """
-    Representa uma colisão 
+    Representa uma colisão
+
+    Durante Space.step(), as colisões são registros reaproveitados de um pool
+    mantido pelo espaço e são sobrescritas no passo seguinte. Colisões
+    recebidas em handlers são válidas apenas durante o passo atual: utilize
+    o método copy() para guardar uma colisão por mais tempo.
     """
 
+    __slots__ = (
+        "body_a",
+        "body_b",
+        "position_x",
+        "position_y",
+        "normal_x",
+        "normal_y",
+        "depth",
+    )
+
     @property
     def bodies(self):
         return [self.body_a, self.body_b]
 
-    def __init__(self, obj_a, obj_b, pos, normal):
+    def __new__(cls, *args, **kwargs):
+        pool = _state.pool
+        if pool is None or cls is not Collision:
+            return object.__new__(cls)
+        return pool.acquire()
+
+    def __init__(self, obj_a, obj_b, pos, normal, depth=0.0):
         self.body_a = obj_a
         self.body_b = obj_b
         self.position_x, self.position_y = pos
         self.normal_x, self.normal_y = normal
+        self.depth = depth
+
+    def __repr__(self):
+        pos = (self.position_x, self.position_y)
+        normal = (self.normal_x, self.normal_y)
+        return f"Collision({self.body_a!r}, {self.body_b!r}, {pos}, {normal}, {self.depth})"
+
+    def copy(self):
+        """
+        Retorna cópia da colisão que não pertence a nenhum pool e, portanto,
+        pode ser guardada após o fim do passo de simulação.
+        """
+        new = object.__new__(type(self))
+        for attr in self.__slots__:
+            setattr(new, attr, getattr(self, attr))
+        return new
+
+    def swap(self):
+        """
+        Inverte a ordem dos corpos e o sentido da normal.
+        """
+        self.body_a, self.body_b = self.body_b, self.body_a
+        self.normal_x = -self.normal_x
+        self.normal_y = -self.normal_y
 
     def resolve(self):
         """
-        Calcula e aplica impulsos de colisão entre dois objetos. 
-        """
-        if self.normal_x == 0:
-            self.body_a.velocity_y *= -1
-            self.body_b.velocity_y *= -1
-        elif self.normal_y == 0:
-            self.body_a.velocity_x *= -1
-            self.body_b.velocity_x *= -1
-        else:
-            self.body_a.velocity_x = 0
-            self.body_a.velocity_y = 0
-            self.body_b.velocity_x = 0
-            self.body_b.velocity_y = 0
-            self.body_a.color = pyxel.COLOR_RED
-            self.body_b.color = pyxel.COLOR_RED
+        Calcula e aplica impulsos de colisão entre dois objetos.
+
+        Apenas corpos dinâmicos são afetados.
+        """
+        for body in (self.body_a, self.body_b):
+            if body.body_type != body.DYNAMIC:
+                continue
+            if self.normal_x == 0:
+                body.velocity_y *= -1
+            elif self.normal_y == 0:
+                body.velocity_x *= -1
+            else:
+                body.velocity_x = 0
+                body.velocity_y = 0
+                body.color = pyxel.COLOR_RED
 
     def draw(self, color=pyxel.COLOR_RED):
         """
@@ -42,3 +98,44 @@ class Collision:
         nx, ny = self.normal_x, self.normal_y
         pyxel.line(x, y, x + nx, y + ny, color)
         pyxel.circ(x, y, 1, color)
+
+
+class CollisionPool:
+    """
+    Conjunto de objetos de colisão pré-alocados e reaproveitados a cada passo
+    de simulação.
+
+    Enquanto o pool estiver ativo (dentro de um bloco with), todas as colisões
+    criadas com Collision(...) na mesma thread são retiradas do pool.
+    """
+
+    def __init__(self, size=64):
+        self._items = [object.__new__(Collision) for _ in range(size)]
+        self._used = 0
+        self._previous = None
+
+    def __len__(self):
+        return self._used
+
+    def __enter__(self):
+        self._previous, _state.pool = _state.pool, self
+        return self
+
+    def __exit__(self, *args):
+        _state.pool, self._previous = self._previous, None
+
+    def acquire(self) -> Collision:
+        """
+        Retorna um registro livre do pool, alocando novos caso necessário.
+        """
+        items, used = self._items, self._used
+        if used == len(items):
+            items.append(object.__new__(Collision))
+        self._used = used + 1
+        return items[used]
+
+    def reset(self):
+        """
+        Libera todos os registros para reutilização.
+        """
+        self._used = 0
@@ -0,0 +1,185 @@
+"""
+Simulação simultânea de várias cópias de um mesmo espaço (ensembles).
+"""
+from typing import List, Tuple
+
+
+class Ensemble:
+    """
+    K cópias de um espaço simuladas em conjunto, criadas por
+    Space.ensemble(k).
+
+    O estado de todas as cópias é guardado em listas planas (x, y, vx, vy,
+    fx, fy) com K * N elementos, onde N é o número de corpos do espaço. O
+    i-ésimo corpo da k-ésima cópia ocupa a posição k * N + i (veja index()).
+    Modifique estas listas para definir condições iniciais diferentes para
+    cada cópia.
+
+    Cada passo aplica forças, atualiza as velocidades, reflete os corpos nas
+    margens e atualiza as posições de todas as cópias com uma única expressão
+    por grandeza. Colisões entre corpos não são consideradas e corpos com
+    force_func, velocity_func ou position_func não são suportados (utilize
+    Ensemble.force_func para aplicar forças).
+    """
+
+    def __init__(self, space, k):
+        if space.periodic:
+            raise ValueError("ensembles não suportam o modo periódico")
+        for body in space.bodies:
+            if body.force_func or body.velocity_func or body.position_func:
+                raise ValueError(
+                    "ensembles não suportam corpos com funções de força, "
+                    "velocidade ou posição"
+                )
+        self.space = space
+        self.copies = k
+        self.time = space.time
+        self.force_func = None
+
+        bodies = list(space.bodies)
+        self.size = n = len(bodies)
+        self.x = [body.position_x for body in bodies] * k
+        self.y = [body.position_y for body in bodies] * k
+        self.vx = [body.velocity_x for body in bodies] * k
+        self.vy = [body.velocity_y for body in bodies] * k
+        self.fx = [0.0] * (k * n)
+        self.fy = [0.0] * (k * n)
+
+        # Parâmetros de cada corpo, repetidos para todas as cópias
+        gravity, damping = space.gravity, space.damping
+        dynamic = [body.body_type == body.DYNAMIC for body in bodies]
+        gx, gy, damp, inertia, restitution = [], [], [], [], []
+        for body, active in zip(bodies, dynamic):
+            g = gravity if body.gravity is None else body.gravity
+            d = damping if body.damping is None else body.damping
+            e = space.restitution if body.restitution is None else body.restitution
+            gx.append(g.x if active else 0.0)
+            gy.append(g.y if active else 0.0)
+            damp.append(d if active else 0.0)
+            inertia.append(body.mass if active else float("inf"))
+            restitution.append(e if active else None)
+        masses = [body.mass if active else 0.0 for body, active in zip(bodies, dynamic)]
+        moving = [float(body.body_type != body.STATIC) for body in bodies]
+        self._mass, self._moving = masses * k, moving * k
+        self._gx, self._gy, self._damping = gx * k, gy * k, damp * k
+        self._inertia, self._restitution = inertia * k, restitution * k
+
+        # Extensão de cada corpo a partir da posição, para as margens
+        self._ext_left = [body.position_x - body.left for body in bodies] * k
+        self._ext_right = [body.right - body.position_x for body in bodies] * k
+        self._ext_bottom = [body.position_y - body.bottom for body in bodies] * k
+        self._ext_top = [body.top - body.position_y for body in bodies] * k
+
+    def index(self, k, i) -> int:
+        """
+        Posição do i-ésimo corpo da k-ésima cópia nas listas de estado.
+        """
+        return k * self.size + i
+
+    def apply_forces(self, fx, fy):
+        """
+        Acumula forças em todos os corpos de todas as cópias. fx e fy são
+        sequências com K * N elementos.
+        """
+        self.fx = [a + b for a, b in zip(self.fx, fx)]
+        self.fy = [a + b for a, b in zip(self.fy, fy)]
+
+    def step(self, dt):
+        """
+        Executa um passo de simulação em todas as cópias.
+
+        Se force_func estiver definida, fn(ensemble, time) é chamada no início
+        do passo e pode utilizar apply_forces() para aplicar forças.
+        """
+        if self.force_func is not None:
+            self.force_func(self, self.time)
+
+        # v += (F / m + g + damping * v) * dt
+        self.vx = [
+            v + (f / m + g + d * v) * dt
+            for v, f, m, g, d in zip(
+                self.vx, self.fx, self._inertia, self._gx, self._damping
+            )
+        ]
+        self.vy = [
+            v + (f / m + g + d * v) * dt
+            for v, f, m, g, d in zip(
+                self.vy, self.fy, self._inertia, self._gy, self._damping
+            )
+        ]
+        n = len(self.fx)
+        self.fx, self.fy = [0.0] * n, [0.0] * n
+
+        self._apply_margins()
+        moving = self._moving
+        self.x = [p + v * dt * m for p, v, m in zip(self.x, self.vx, moving)]
+        self.y = [p + v * dt * m for p, v, m in zip(self.y, self.vy, moving)]
+        self.time += dt
+
+    def _apply_margins(self):
+        space = self.space
+        inf = float("inf")
+        left = -inf if space.margin_left is None else space.margin_left
+        right = inf if space.margin_right is None else space.margin_right
+        bottom = -inf if space.margin_bottom is None else space.margin_bottom
+        top = inf if space.margin_top is None else space.margin_top
+        if left == bottom == -inf and right == top == inf:
+            return
+
+        restitution = self._restitution
+        self.vx = [
+            -e * v
+            if e is not None
+            and ((p - lo <= left and v < 0) or (p + hi >= right and v > 0))
+            else v
+            for p, v, lo, hi, e in zip(
+                self.x, self.vx, self._ext_left, self._ext_right, restitution
+            )
+        ]
+        self.vy = [
+            -e * v
+            if e is not None
+            and ((p - lo <= bottom and v < 0) or (p + hi >= top and v > 0))
+            else v
+            for p, v, lo, hi, e in zip(
+                self.y, self.vy, self._ext_bottom, self._ext_top, restitution
+            )
+        ]
+
+    #
+    # Leitura dos resultados
+    #
+    def positions(self, k) -> List[Tuple[float, float]]:
+        """
+        Lista com as posições dos corpos da k-ésima cópia.
+        """
+        start, end = k * self.size, (k + 1) * self.size
+        return list(zip(self.x[start:end], self.y[start:end]))
+
+    def velocities(self, k) -> List[Tuple[float, float]]:
+        """
+        Lista com as velocidades dos corpos da k-ésima cópia.
+        """
+        start, end = k * self.size, (k + 1) * self.size
+        return list(zip(self.vx[start:end], self.vy[start:end]))
+
+    def kinetic_energy(self) -> List[float]:
+        """
+        Lista com a energia cinética total dos corpos dinâmicos de cada cópia.
+        """
+        n = self.size
+        energy = [
+            m * (vx * vx + vy * vy) / 2
+            for m, vx, vy in zip(self._mass, self.vx, self.vy)
+        ]
+        return [sum(energy[k * n : (k + 1) * n]) for k in range(self.copies)]
+
+    def apply_to_space(self, k):
+        """
+        Copia o estado da k-ésima cópia para os corpos do espaço original,
+        por exemplo, para desenhá-la.
+        """
+        start = k * self.size
+        for i, body in enumerate(self.space.bodies):
+            body.position_x, body.position_y = self.x[start + i], self.y[start + i]
+            body.velocity_x, body.velocity_y = self.vx[start + i], self.vy[start + i]
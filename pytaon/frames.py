@@ -0,0 +1,57 @@
+"""
+Frames produzidos por Space.iter_steps().
+"""
+from array import array
+from itertools import chain
+from operator import attrgetter
+from typing import Iterator, Tuple
+
+# Atributos lidos de cada corpo para cada campo dos frames. AABBs derivam a
+# posição dos limites, por isso a posição é lida por position_x/position_y.
+FIELDS = {
+    "position": attrgetter("position_x", "position_y"),
+    "velocity": attrgetter("velocity.x", "velocity.y"),
+    "force": attrgetter("force.x", "force.y"),
+}
+
+
+class Frame:
+    """
+    Estado dos corpos de um espaço ao final de um passo de simulação.
+
+    Os campos requisitados (position, velocity, force) são arrays de doubles
+    no formato [x0, y0, x1, y1, ...], na ordem de space.bodies. Os campos não
+    requisitados são None. Os arrays suportam o protocolo de buffer e podem
+    ser lidos sem cópias com memoryview() ou numpy.frombuffer().
+    """
+
+    __slots__ = ("step", "time", "position", "velocity", "force")
+
+    def __init__(self, step, time, position=None, velocity=None, force=None):
+        self.step = step
+        self.time = time
+        self.position = position
+        self.velocity = velocity
+        self.force = force
+
+    def __repr__(self):
+        return f"Frame(step={self.step}, time={self.time})"
+
+    def pairs(self, field) -> Iterator[Tuple[float, float]]:
+        """
+        Itera sobre os pares (x, y) de cada corpo no campo dado.
+        """
+        values = getattr(self, field)
+        return zip(values[::2], values[1::2])
+
+    @classmethod
+    def from_space(cls, space, step, fields) -> "Frame":
+        """
+        Cria frame com os campos dados a partir do estado atual do espaço.
+        """
+        bodies = space.bodies
+        data = {
+            field: array("d", chain.from_iterable(map(FIELDS[field], bodies)))
+            for field in fields
+        }
+        return cls(step, space.time, **data)
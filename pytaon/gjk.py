@@ -0,0 +1,286 @@
+"""
+Detecção de colisões genérica entre corpos convexos via GJK e EPA.
+
+Os algoritmos trabalham na diferença de Minkowski A - B a partir da função
+support(direction) de cada corpo, que retorna o ponto mais distante da figura
+na direção dada. Qualquer par de figuras convexas colide sem a necessidade de
+uma rotina específica para o par.
+"""
+
+import threading
+from math import sqrt
+
+from .collision import Collision
+
+GJK_MAX_ITER = 32
+EPA_MAX_ITER = 32
+EPA_TOLERANCE = 1e-6
+
+
+class _CacheState(threading.local):
+    # Cache de eixos ativo em cada thread.
+    cache = None
+
+
+_state = _CacheState()
+
+
+class SeparatingAxisCache:
+    """
+    Último eixo separador encontrado para cada par de corpos. É utilizado como
+    direção inicial do GJK no passo seguinte, o que permite descartar pares
+    que continuam separados com uma única avaliação da função support.
+
+    Cada espaço possui o seu cache. Os eixos gravados em um passo só são
+    consultados no passo seguinte: a cada chamada de advance(), os pares que
+    não foram testados no passo anterior são descartados. Enquanto o cache
+    estiver ativo (dentro de um bloco with), get_collision_gjk() o utiliza
+    na mesma thread.
+    """
+
+    def __init__(self):
+        self._previous = {}
+        self._current = {}
+        self._saved = None
+
+    def __len__(self):
+        return len(self._current)
+
+    def __enter__(self):
+        self._saved, _state.cache = _state.cache, self
+        return self
+
+    def __exit__(self, *args):
+        _state.cache, self._saved = self._saved, None
+
+    def get(self, a, b):
+        """
+        Eixo separador gravado para o par no passo anterior ou None.
+        """
+        return self._previous.get((a, b))
+
+    def store(self, a, b, axis):
+        """
+        Grava eixo separador do par no passo atual.
+        """
+        self._current[a, b] = axis
+
+    def advance(self):
+        """
+        Inicia um novo passo, descartando os pares que não foram testados.
+        """
+        self._previous, self._current = self._current, {}
+
+
+def get_collision_gjk(a, b):
+    """
+    Verifica colisão entre dois corpos convexos quaisquer e retorna um objeto
+    de colisão com normal apontando de a para b ou None caso não exista
+    superposição.
+    """
+    if a.right < b.left or b.right < a.left or a.top < b.bottom or b.top < a.bottom:
+        return None
+
+    cache = _state.cache
+    axis = None if cache is None else cache.get(a, b)
+    if axis is None:
+        axis = (b.position.x - a.position.x, b.position.y - a.position.y)
+
+    hit, result = gjk(a, b, axis)
+    if not hit:
+        if cache is not None:
+            cache.store(a, b, result)
+        return None
+
+    normal, depth, pos = epa(a, b, result)
+    return Collision(a, b, pos, _snap_normal(*normal), depth)
+
+
+def gjk(a, b, direction=(1.0, 0.0)):
+    """
+    Algoritmo de Gilbert-Johnson-Keerthi.
+
+    Retorna (True, simplex) caso a diferença de Minkowski contenha a origem ou
+    (False, axis) com um eixo separador entre os corpos caso contrário. Os
+    vértices do simplex são retornados por _support().
+    """
+    dx, dy = direction
+    if dx == 0 and dy == 0:
+        dx = 1.0
+
+    v = _support(a, b, dx, dy)
+    px, py = v[0], v[1]
+    if px * dx + py * dy < 0:
+        return False, (dx, dy)
+    simplex = [v]
+    dx, dy = -px, -py
+
+    for _ in range(GJK_MAX_ITER):
+        if dx == 0 and dy == 0:
+            return True, simplex
+
+        v = _support(a, b, dx, dy)
+        px, py = v[0], v[1]
+        if px * dx + py * dy < 0:
+            return False, (dx, dy)
+        simplex.append(v)
+
+        if len(simplex) == 2:
+            vb, va = simplex
+            dx, dy = _line_direction(va[0], va[1], vb[0], vb[1])
+        else:
+            vc, vb, va = simplex
+            (ax, ay), (bx, by), (cx, cy) = va[:2], vb[:2], vc[:2]
+            abx, aby = bx - ax, by - ay
+            acx, acy = cx - ax, cy - ay
+
+            # Normais das arestas AB e AC apontando para fora do triângulo.
+            ab_x, ab_y = _perp_away(abx, aby, acx, acy)
+            if ab_x * -ax + ab_y * -ay > 0:
+                simplex = [vb, va]
+                dx, dy = ab_x, ab_y
+                continue
+
+            ac_x, ac_y = _perp_away(acx, acy, abx, aby)
+            if ac_x * -ax + ac_y * -ay > 0:
+                simplex = [vc, va]
+                dx, dy = ac_x, ac_y
+                continue
+
+            return True, simplex
+
+    return True, simplex
+
+
+def epa(a, b, simplex):
+    """
+    Expanding Polytope Algorithm.
+
+    Recebe o simplex final do GJK e retorna a normal (apontando de a para b),
+    a profundidade de penetração e o ponto de contato entre os dois corpos.
+
+    O ponto de contato é obtido a partir das coordenadas baricêntricas da
+    projeção da origem sobre a aresta mais próxima do politopo: os pontos
+    correspondentes em a e em b são interpolados e o contato é o ponto médio
+    entre eles, caso esteja contido nos dois corpos.
+    """
+    polytope = _complete_simplex(a, b, list(simplex))
+    if _signed_area(polytope) < 0:
+        polytope.reverse()
+
+    for _ in range(EPA_MAX_ITER):
+        idx, nx, ny, dist = _closest_edge(polytope)
+        v = _support(a, b, nx, ny)
+        if v[0] * nx + v[1] * ny - dist < EPA_TOLERANCE:
+            break
+        polytope.insert(idx + 1, v)
+    else:
+        idx, nx, ny, dist = _closest_edge(polytope)
+
+    p, q = polytope[idx], polytope[(idx + 1) % len(polytope)]
+    ex, ey = q[0] - p[0], q[1] - p[1]
+    norm_sqr = ex * ex + ey * ey
+    t = 0.0 if norm_sqr == 0 else -(p[0] * ex + p[1] * ey) / norm_sqr
+    t = min(max(t, 0.0), 1.0)
+    ax, ay = p[2] + t * (q[2] - p[2]), p[3] + t * (q[3] - p[3])
+    bx, by = p[4] + t * (q[4] - p[4]), p[5] + t * (q[5] - p[5])
+
+    # Em penetrações profundas o ponto médio pode estar fora de um dos corpos:
+    # neste caso, utiliza o ponto de b (que penetra a) ou o ponto de a.
+    candidates = [((ax + bx) / 2, (ay + by) / 2), (bx, by), (ax, ay)]
+    for x, y in candidates:
+        if a.contains_point(x, y) and b.contains_point(x, y):
+            return (nx, ny), dist, (x, y)
+    return (nx, ny), dist, candidates[0]
+
+
+#
+# Funções auxiliares
+#
+def _snap_normal(nx, ny):
+    """
+    Elimina o ruído numérico de normais alinhadas aos eixos, para que
+    Collision.resolve() as reconheça como tal.
+    """
+    if abs(nx) < EPA_TOLERANCE:
+        return 0.0, (1.0 if ny > 0 else -1.0)
+    if abs(ny) < EPA_TOLERANCE:
+        return (1.0 if nx > 0 else -1.0), 0.0
+    return nx, ny
+
+
+def _support(a, b, dx, dy):
+    """
+    Função support da diferença de Minkowski A - B. Retorna o ponto da
+    diferença seguido dos pontos de suporte de a e de b que o geram.
+    """
+    ax, ay = a.support((dx, dy))
+    bx, by = b.support((-dx, -dy))
+    return ax - bx, ay - by, ax, ay, bx, by
+
+
+def _line_direction(ax, ay, bx, by):
+    """
+    Direção perpendicular ao segmento AB apontando para a origem.
+    """
+    abx, aby = bx - ax, by - ay
+    # (AB x AO) x AB
+    cross = abx * -ay - aby * -ax
+    return -aby * cross, abx * cross
+
+
+def _perp_away(ux, uy, vx, vy):
+    """
+    Vetor perpendicular a u que aponta para longe de v.
+    """
+    px, py = -uy, ux
+    if px * vx + py * vy > 0:
+        return uy, -ux
+    return px, py
+
+
+def _complete_simplex(a, b, simplex):
+    """
+    Completa simplex degenerado (origem sobre um vértice ou aresta) para um
+    triângulo que contém a origem.
+    """
+    if len(simplex) == 1:
+        p = simplex[0][:2]
+        for dx, dy in [(1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)]:
+            q = _support(a, b, dx, dy)
+            if q[:2] != p:
+                simplex.append(q)
+                break
+    if len(simplex) == 2:
+        (ax, ay), (bx, by) = simplex[0][:2], simplex[1][:2]
+        dx, dy = -(by - ay), bx - ax
+        for dx, dy in [(dx, dy), (-dx, -dy)]:
+            q = _support(a, b, dx, dy)
+            if (q[0] - ax) * dx + (q[1] - ay) * dy > EPA_TOLERANCE:
+                simplex.append(q)
+                break
+    return simplex
+
+
+def _closest_edge(polytope):
+    best = (0, 1.0, 0.0, float("inf"))
+    n = len(polytope)
+    for i in range(n):
+        ax, ay = polytope[i][:2]
+        bx, by = polytope[(i + 1) % n][:2]
+        ex, ey = bx - ax, by - ay
+        norm = sqrt(ex * ex + ey * ey)
+        if norm == 0:
+            continue
+        nx, ny = ey / norm, -ex / norm
+        dist = nx * ax + ny * ay
+        if dist < best[3]:
+            best = (i, nx, ny, dist)
+    return best
+
+
+def _signed_area(points):
+    total = 0.0
+    for p, q in zip(points, [*points[1:], points[0]]):
+        total += p[0] * q[1] - q[0] * p[1]
+    return total / 2
@@ -0,0 +1,115 @@
+"""
+Sistema de partículas leve para efeitos decorativos (faíscas, estrelas, etc).
+"""
+from collections import deque
+from itertools import compress, repeat
+from operator import gt, le
+
+from . import backend as pyxel
+from .vec2d import asvec2d
+
+
+class ParticleSystem:
+    """
+    Conjunto de partículas sem colisões, criado por Space.add_particle_system().
+
+    Posição, velocidade, instante de expiração e cor de cada partícula são
+    guardados em listas paralelas (x, y, vx, vy, expire, color). As partículas
+    expiradas são recicladas por novas emissões a partir de uma lista de
+    posições livres.
+
+    Cada passo atualiza as listas inteiras de uma só vez, sem chamadas de
+    função por partícula. As partículas sofrem a ação da gravidade e do
+    amortecimento do sistema ou, caso sejam None, do espaço.
+    """
+
+    def __init__(self, capacity=1024, gravity=None, damping=None):
+        self.gravity = None if gravity is None else asvec2d(gravity)
+        self.damping = None if damping is None else float(damping)
+        self.time = 0.0
+        self.x = [0.0] * capacity
+        self.y = [0.0] * capacity
+        self.vx = [0.0] * capacity
+        self.vy = [0.0] * capacity
+        self.expire = [0.0] * capacity
+        self.color = [0] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.expire) - len(self._free)
+
+    def emit(self, pos, vel=(0, 0), lifetime=1.0, color=pyxel.COLOR_WHITE) -> int:
+        """
+        Cria partícula e retorna sua posição nas listas. A partícula deixa de
+        existir após lifetime segundos (utilize float("inf") para partículas
+        permanentes).
+        """
+        (x, y), (vx, vy) = pos, vel
+        expire = self.time + lifetime
+        if self._free:
+            idx = self._free.pop()
+            self.x[idx], self.y[idx] = x, y
+            self.vx[idx], self.vy[idx] = vx, vy
+            self.expire[idx], self.color[idx] = expire, color
+        else:
+            idx = len(self.expire)
+            self.x.append(x)
+            self.y.append(y)
+            self.vx.append(vx)
+            self.vy.append(vy)
+            self.expire.append(expire)
+            self.color.append(color)
+        return idx
+
+    def clear(self):
+        """
+        Remove todas as partículas.
+        """
+        n = len(self.expire)
+        self.expire = [self.time] * n
+        self._free = list(range(n - 1, -1, -1))
+
+    def step(self, dt, gravity=(0, 0), damping=0.0):
+        """
+        Avança as partículas por um intervalo dt. Os valores de gravidade e
+        amortecimento são utilizados caso o sistema não defina os seus.
+
+        As partículas mortas também são atualizadas: percorrer as listas
+        inteiras é mais barato que selecionar as partículas vivas.
+        """
+        gx, gy = gravity if self.gravity is None else self.gravity
+        damping = damping if self.damping is None else self.damping
+        self.time = now = self.time + dt
+
+        # v += (g + damping * v) * dt, ou seja, v = v * (1 + damping * dt) + g * dt
+        if gx or gy or damping:
+            scale, dvx, dvy = 1 + damping * dt, gx * dt, gy * dt
+            self.vx = [v * scale + dvx for v in self.vx]
+            self.vy = [v * scale + dvy for v in self.vy]
+        self.x = [p + v * dt for p, v in zip(self.x, self.vx)]
+        self.y = [p + v * dt for p, v in zip(self.y, self.vy)]
+
+        # Posições livres em ordem decrescente: pop() reutiliza as primeiras.
+        expired = map(le, self.expire, repeat(now))
+        free = list(compress(range(len(self.expire)), expired))
+        free.reverse()
+        self._free = free
+
+    def alive(self) -> bytes:
+        """
+        Retorna máscara com 1 para as partículas vivas e 0 para as expiradas.
+        """
+        return bytes(map(gt, self.expire, repeat(self.time)))
+
+    def draw(self):
+        """
+        Desenha as partículas vivas como pixels.
+        """
+        alive = self.alive()
+        pixels = map(
+            pyxel.pset,
+            compress(self.x, alive),
+            compress(self.y, alive),
+            compress(self.color, alive),
+        )
+        deque(pixels, maxlen=0)
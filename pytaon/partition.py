@@ -0,0 +1,302 @@
+"""
+Simulação de um único espaço dividido em regiões simuladas em processos
+separados (decomposição de domínio).
+"""
+import os
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from .batch import STATE_SIZE
+
+# Estado de cada processo de trabalho.
+_space = None
+_bodies = []
+_owned = set()
+_local = set()
+_bounds = []
+_region = None
+_width = 0.0
+_shm = None
+_views = None
+
+
+class PartitionedSpace:
+    """
+    Espaço dividido em faixas verticais, cada uma simulada por um processo de
+    trabalho.
+
+    Todos os processos criam o mesmo espaço com factory(), que deve ser uma
+    função determinística definida no nível de um módulo. Cada processo
+    mantém apenas os corpos cujo centro está em sua faixa e os "fantasmas":
+    corpos das faixas vizinhas a menos de ghost_width da fronteira, que
+    participam das colisões mas cujo estado é descartado ao final do passo.
+    Os corpos estáticos estão presentes em todos os processos. As fronteiras
+    são escolhidas para que as faixas tenham inicialmente o mesmo número de
+    corpos e permanecem fixas. Corpos que cruzam uma fronteira migram para o
+    processo vizinho.
+
+    Por padrão, ghost_width é a maior largura dentre os corpos, o que garante
+    que todos os pares em contato sejam encontrados. O resultado é equivalente
+    ao de Space.step() em um único processo enquanto os corpos não crescerem
+    e as colisões afetarem cada corpo de forma independente (como em
+    Collision.resolve()). Handlers de colisão também são chamados para pares
+    envolvendo fantasmas. O modo periódico não é suportado.
+
+    O estado dos corpos (x, y, vx, vy, na ordem de space.bodies) é trocado
+    através de memória compartilhada, como em SpaceBatch.
+    """
+
+    def __init__(self, factory, workers=None, ghost_width=None):
+        workers = workers or os.cpu_count() or 1
+        resource_tracker.ensure_running()
+        self._executors = [ProcessPoolExecutor(max_workers=1) for _ in range(workers)]
+        self.time = 0.0
+
+        # Escolhe as fronteiras a partir de uma cópia do espaço.
+        survey = self._executors[0].submit(_survey, factory, workers)
+        try:
+            n, bounds, width = survey.result()
+        except Exception:
+            self.close()
+            raise
+        self.ghost_width = width if ghost_width is None else ghost_width
+        self._bounds = bounds
+        edges = [float("-inf"), *bounds, float("inf")]
+        self._edges = list(zip(edges, edges[1:]))
+        for lo, hi in self._edges[1:-1]:
+            if hi - lo < self.ghost_width:
+                self.close()
+                raise ValueError("regiões mais estreitas que as zonas de fantasmas")
+
+        # O estado é duplicado: a cada passo os processos leem uma metade e
+        # gravam a outra, para que nenhum processo sobrescreva o estado de um
+        # corpo antes que seus vizinhos o leiam como fantasma.
+        self._size = n
+        self._shm = SharedMemory(create=True, size=16 * STATE_SIZE * max(n, 1))
+        self._views = _split(self._shm)
+        self._current = 0
+        args = (factory, self._shm.name, bounds, self.ghost_width)
+        futures = [
+            executor.submit(_init, *args, k)
+            for k, executor in enumerate(self._executors)
+        ]
+        self._route([future.result() for future in futures])
+
+    def __len__(self):
+        return self._size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _route(self, results):
+        """
+        Distribui os corpos que migraram e define os fantasmas de cada região
+        para o próximo passo.
+        """
+        view, width = self._views[self._current], self.ghost_width
+        regions = len(results)
+        immigrants = [[] for _ in range(regions)]
+        low = [list(result[1]) for result in results]
+        high = [list(result[2]) for result in results]
+        for emigrants, _, _ in results:
+            for idx, dest in emigrants:
+                immigrants[dest].append(idx)
+                lo, hi = self._edges[dest]
+                x = view[STATE_SIZE * idx]
+                if x < lo + width:
+                    low[dest].append(idx)
+                if x >= hi - width:
+                    high[dest].append(idx)
+
+        ghosts = [[] for _ in range(regions)]
+        for k in range(regions):
+            if k > 0:
+                ghosts[k].extend(high[k - 1])
+            if k < regions - 1:
+                ghosts[k].extend(low[k + 1])
+        self._immigrants, self._ghosts = immigrants, ghosts
+
+    def step(self, dt, n=1):
+        """
+        Executa n passos de simulação de tamanho dt.
+        """
+        for _ in range(n):
+            futures = [
+                executor.submit(_step, dt, self._current, immigrants, ghosts)
+                for executor, immigrants, ghosts in zip(
+                    self._executors, self._immigrants, self._ghosts
+                )
+            ]
+            results = [future.result() for future in futures]
+            self._current = 1 - self._current
+            self._route(results)
+            self.time += dt
+
+    def owner(self, i) -> int:
+        """
+        Índice da região responsável pelo i-ésimo corpo.
+        """
+        return bisect_right(self._bounds, self._views[self._current][STATE_SIZE * i])
+
+    def positions(self) -> list:
+        """
+        Lista com as posições (x, y) de todos os corpos.
+        """
+        values = self._views[self._current].tolist()
+        return list(zip(values[0::STATE_SIZE], values[1::STATE_SIZE]))
+
+    def state(self, i) -> array:
+        """
+        Retorna cópia do estado [x, y, vx, vy] do i-ésimo corpo.
+        """
+        start = STATE_SIZE * i
+        return array("d", self._views[self._current][start : start + STATE_SIZE])
+
+    def set_state(self, i, values):
+        """
+        Modifica o estado do i-ésimo corpo. A modificação é aplicada no
+        próximo step() e não deve mover o corpo para outra região.
+        """
+        start = STATE_SIZE * i
+        self._views[self._current][start : start + STATE_SIZE] = array("d", values)
+
+    def close(self):
+        """
+        Encerra os processos e libera a memória compartilhada.
+        """
+        if self._executors is None:
+            return
+        if getattr(self, "_shm", None) is not None:
+            futures = [executor.submit(_detach) for executor in self._executors]
+            for future in futures:
+                future.result()
+        for executor in self._executors:
+            executor.shutdown()
+        self._executors = None
+        if getattr(self, "_shm", None) is not None:
+            for view in self._views:
+                view.release()
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+#
+# Funções executadas nos processos de trabalho
+#
+def _survey(factory, regions):
+    space = factory()
+    if space.periodic:
+        raise ValueError("espaços particionados não suportam o modo periódico")
+    movers = [body for body in space.bodies if body.body_type != body.STATIC]
+    if len(movers) < regions:
+        raise ValueError("número de corpos menor que o número de regiões")
+    xs = sorted(body.position_x for body in movers)
+    bounds = [xs[len(xs) * k // regions] for k in range(1, regions)]
+    width = max((body.right - body.left for body in movers), default=0.0)
+    return len(space.bodies), bounds, width
+
+
+def _init(factory, name, bounds, width, region):
+    global _space, _bodies, _owned, _local, _bounds, _region, _width, _shm, _views
+    _space = factory()
+    _bodies = list(_space.bodies)
+    _bounds, _region, _width = bounds, region, width
+    _shm = SharedMemory(name)
+    _views = _split(_shm)
+
+    movers = [i for i, body in enumerate(_bodies) if body.body_type != body.STATIC]
+    _owned = {i for i in movers if _find_region(_bodies[i]) == region}
+    _local = set(_owned)
+    _space.remove_many([_bodies[i] for i in movers if i not in _owned])
+    # Os corpos estáticos nunca são gravados novamente.
+    if region == 0:
+        _store(range(len(_bodies)), 0)
+        _store(range(len(_bodies)), 1)
+    else:
+        _store(_owned, 0)
+    return [], *_bands()
+
+
+def _split(shm):
+    """
+    Divide o bloco de memória compartilhada em duas metades de doubles.
+    """
+    half = shm.size // 16
+    return shm.buf[: 8 * half].cast("d"), shm.buf[8 * half : 16 * half].cast("d")
+
+
+def _detach():
+    global _views, _shm
+    for view in _views:
+        view.release()
+    _shm.close()
+    _views = _shm = None
+
+
+def _find_region(body):
+    return bisect_right(_bounds, body.position_x)
+
+
+def _bands():
+    """
+    Corpos próprios que são fantasmas das regiões vizinhas.
+    """
+    lo = _bounds[_region - 1] + _width if _region > 0 else float("-inf")
+    hi = _bounds[_region] - _width if _region < len(_bounds) else float("inf")
+    low, high = [], []
+    for i in _owned:
+        x = _bodies[i].position_x
+        if x < lo:
+            low.append(i)
+        if x >= hi:
+            high.append(i)
+    return low, high
+
+
+def _store(indices, current):
+    view = _views[current]
+    for i in indices:
+        body = _bodies[i]
+        start = STATE_SIZE * i
+        view[start : start + STATE_SIZE] = array(
+            "d", (body.position_x, body.position_y, body.velocity_x, body.velocity_y)
+        )
+
+
+def _load(indices, current):
+    view = _views[current]
+    for i in indices:
+        body = _bodies[i]
+        start = STATE_SIZE * i
+        x, y, vx, vy = view[start : start + STATE_SIZE]
+        if x != body.position_x or y != body.position_y:
+            body.position_x, body.position_y = x, y
+        body.velocity_x, body.velocity_y = vx, vy
+
+
+def _step(dt, current, immigrants, ghosts):
+    global _local
+    _owned.update(immigrants)
+    local = _owned.union(ghosts)
+    _space.remove_many([_bodies[i] for i in _local - local])
+    _space.add_many([_bodies[i] for i in sorted(local - _local)])
+    _local = local
+    _load(local, current)
+
+    _space.step(dt)
+    _store(_owned, 1 - current)
+
+    emigrants = []
+    for i in _owned:
+        region = _find_region(_bodies[i])
+        if region != _region:
+            emigrants.append((i, region))
+    _owned.difference_update(i for i, _ in emigrants)
+    return emigrants, *_bands()
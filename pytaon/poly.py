@@ -1,62 +1,304 @@
-import pyxel
+from math import sqrt
 
+from . import backend as pyxel
 from .body import Body
 from .collision import Collision
+from .query import ray_rounded_poly, segment_query_result
+from .vec2d import Vec2d
+
+# Normais e deslocamentos (em relação ao centro) das arestas de uma AABB.
+AABB_NORMALS = [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0)]
 
 
 class Poly(Body):
     """
-    Objeto com caixa de contorno poligonal e alinhada aos eixos. 
+    Objeto com caixa de contorno poligonal e convexa.
+
+    Os vértices são armazenados uma única vez no referencial do centro de
+    gravidade, junto com as normais das arestas, área e momento de inércia.
+    Os vértices em coordenadas do mundo são calculados sob demanda e
+    reaproveitados enquanto a posição do corpo não mudar.
     """
 
     @property
     def area(self):
-        raise area(self._vertices)
-
-    @property
-    def position_x(self):
-        return center_of_gravity(self._vertices)
-
-    @position_x.setter
-    def position_x(self, value):
-        dx = value - self.position_x
-        self._vertices = [v + (dx, 0) for v in self._vertices]
+        return self._area
 
     @property
-    def position_y(self):
-        raise NotImplementedError
+    def moment(self):
+        """
+        Momento de inércia com relação ao centro de gravidade.
+        """
+        return self.mass * self._moment_per_mass
 
-    @position_y.setter
-    def position_y(self, value):
-        raise NotImplementedError
+    right = property(lambda self: self.position.x + self._local_right)
+    left = property(lambda self: self.position.x + self._local_left)
+    top = property(lambda self: self.position.y + self._local_top)
+    bottom = property(lambda self: self.position.y + self._local_bottom)
 
     def __init__(self, vertices, *args, **kwargs):
-        self._vertices = list(vertices)
-        super().__init__((self.position_x, self.position_y), *args, **kwargs)
+        vertices = [(float(x), float(y)) for x, y in vertices]
+        if area(vertices) < 0:
+            vertices.reverse()
+
+        cx, cy = center_of_gravity(vertices)
+        local = [(x - cx, y - cy) for x, y in vertices]
+        self._local_vertices = local
+        self._normals = edge_normals(local)
+        self._offsets = [
+            nx * x + ny * y for (nx, ny), (x, y) in zip(self._normals, local)
+        ]
+        self._area = area(local)
+        self._moment_per_mass = moment_per_mass(local)
+        self._local_left = min(x for x, _ in local)
+        self._local_right = max(x for x, _ in local)
+        self._local_bottom = min(y for _, y in local)
+        self._local_top = max(y for _, y in local)
+        self._cache_x = self._cache_y = None
+        self._world_vertices = None
+        super().__init__((cx, cy), *args, **kwargs)
 
     def get_vertices(self):
-        return self._vertices
+        """
+        Lista de vértices em coordenadas do mundo.
+
+        A lista é reaproveitada enquanto o corpo não se mover e não deve ser
+        modificada.
+        """
+        x, y = self.position.x, self.position.y
+        if x != self._cache_x or y != self._cache_y:
+            self._world_vertices = [
+                Vec2d(x + vx, y + vy) for vx, vy in self._local_vertices
+            ]
+            self._cache_x, self._cache_y = x, y
+        return self._world_vertices
 
     def draw(self):
-        raise NotImplementedError
+        vertices = self.get_vertices()
+        a = vertices[0]
+        for b, c in zip(vertices[1:], vertices[2:]):
+            pyxel.tri(a.x, a.y, b.x, b.y, c.x, c.y, self.color)
+
+    def contains_point(self, x, y):
+        x -= self.position.x
+        y -= self.position.y
+        for (nx, ny), d in zip(self._normals, self._offsets):
+            if nx * x + ny * y > d:
+                return False
+        return True
+
+    @classmethod
+    def contains_points(cls, bodies, xs, ys):
+        result = []
+        append = result.append
+        for body, x, y in zip(bodies, xs, ys):
+            pos = body.position
+            x -= pos.x
+            y -= pos.y
+            for (nx, ny), d in zip(body._normals, body._offsets):
+                if nx * x + ny * y > d:
+                    append(False)
+                    break
+            else:
+                append(True)
+        return result
 
-    def update_position(self, dt):
-        raise NotImplementedError
+    def segment_query(self, a, b, radius=0.0):
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        x, y = self.position.x, self.position.y
+        planes = [
+            (nx, ny, d + nx * x + ny * y)
+            for (nx, ny), d in zip(self._normals, self._offsets)
+        ]
+        hit = ray_rounded_poly(ax, ay, dx, dy, self.get_vertices(), planes, radius)
+        return segment_query_result(self, ax, ay, dx, dy, hit)
 
+    def support(self, direction):
+        dx, dy = direction
+        return max(self.get_vertices(), key=lambda v: dx * v.x + dy * v.y)
+
+    #
+    # Colisões pelo teorema do eixo separador (SAT)
+    #
     def get_collision(self, other):
-        raise NotImplementedError
+        return other.get_collision_poly(self)
+
+    def get_collision_poly(self, other):
+        x, y = self.position.x, self.position.y
+        ox, oy = other.position.x, other.position.y
+        offsets = [
+            d + nx * x + ny * y for (nx, ny), d in zip(self._normals, self._offsets)
+        ]
+        other_offsets = [
+            d + nx * ox + ny * oy for (nx, ny), d in zip(other._normals, other._offsets)
+        ]
+        return _sat_collision(
+            self,
+            other,
+            self.get_vertices(),
+            self._normals,
+            offsets,
+            other.get_vertices(),
+            other._normals,
+            other_offsets,
+        )
 
     def get_collision_aabb(self, other):
-        raise NotImplementedError
+        x, y = self.position.x, self.position.y
+        offsets = [
+            d + nx * x + ny * y for (nx, ny), d in zip(self._normals, self._offsets)
+        ]
+        left, right, bottom, top = other.left, other.right, other.bottom, other.top
+        other_vertices = [
+            Vec2d(left, bottom),
+            Vec2d(right, bottom),
+            Vec2d(right, top),
+            Vec2d(left, top),
+        ]
+        other_offsets = [right, top, -left, -bottom]
+        return _sat_collision(
+            self,
+            other,
+            self.get_vertices(),
+            self._normals,
+            offsets,
+            other_vertices,
+            AABB_NORMALS,
+            other_offsets,
+        )
+
+    def get_collision_circle(self, other):
+        cx, cy = other.position.x, other.position.y
+        radius = other.radius
+        x, y = self.position.x, self.position.y
+
+        # Aresta de maior separação com relação ao centro do círculo.
+        best, max_sep = 0, float("-inf")
+        for i, ((nx, ny), d) in enumerate(zip(self._normals, self._offsets)):
+            sep = nx * (cx - x) + ny * (cy - y) - d
+            if sep > radius:
+                return None
+            if sep > max_sep:
+                best, max_sep = i, sep
+
+        local = self._local_vertices
+        ax, ay = local[best]
+        bx, by = local[(best + 1) % len(local)]
+        ax, ay, bx, by = ax + x, ay + y, bx + x, by + y
+        ex, ey = bx - ax, by - ay
+        t = ((cx - ax) * ex + (cy - ay) * ey) / (ex * ex + ey * ey)
+
+        # Centro do círculo está na região de Voronoi de um dos vértices.
+        if t < 0.0 or t > 1.0:
+            vx, vy = (ax, ay) if t < 0.0 else (bx, by)
+            dx, dy = cx - vx, cy - vy
+            dist = sqrt(dx * dx + dy * dy)
+            if dist > radius:
+                return None
+            if dist == 0.0:
+                nx, ny = self._normals[best]
+            else:
+                nx, ny = dx / dist, dy / dist
+            return Collision(self, other, (vx, vy), (nx, ny), radius - dist)
+
+        nx, ny = self._normals[best]
+        depth = radius - max_sep
+        pos = (cx - nx * (radius - depth / 2), cy - ny * (radius - depth / 2))
+        return Collision(self, other, pos, (nx, ny), depth)
+
+
+def _sat_collision(a, b, verts_a, normals_a, offsets_a, verts_b, normals_b, offsets_b):
+    """
+    Teste de eixo separador entre dois polígonos convexos a partir das normais
+    e deslocamentos (n . v = d) das arestas de cada polígono.
+
+    A normal da colisão aponta de a para b.
+    """
+    sep_a, normal_a = _max_separation(normals_a, offsets_a, verts_b)
+    if sep_a > 0:
+        return None
+    sep_b, normal_b = _max_separation(normals_b, offsets_b, verts_a)
+    if sep_b > 0:
+        return None
+
+    if sep_a >= sep_b:
+        nx, ny = normal_a
+        incident = verts_b
+        depth = -sep_a
+    else:
+        nx, ny = normal_b
+        nx, ny = -nx, -ny
+        incident = verts_a
+        depth = -sep_b
+
+    # Ponto de contato: centro dos vértices da região de interseção. Caso a
+    # região seja degenerada, utiliza o vértice mais profundo do polígono
+    # incidente, deslocado para o meio da região de interpenetração.
+    pos = _intersection_center(
+        verts_a, normals_a, offsets_a, verts_b, normals_b, offsets_b
+    )
+    if pos is None:
+        sign = 1 if incident is verts_b else -1
+        v = min(incident, key=lambda v: sign * (nx * v.x + ny * v.y))
+        shift = sign * depth / 2
+        pos = (v.x + nx * shift, v.y + ny * shift)
+    return Collision(a, b, pos, (nx, ny), depth)
+
+
+def _intersection_center(verts_a, normals_a, offsets_a, verts_b, normals_b, offsets_b):
+    """
+    Média dos vértices da interseção entre dois polígonos convexos: vértices de
+    cada polígono contidos no outro e pontos de cruzamento entre as arestas.
+    Retorna None se não houver nenhum destes pontos.
+    """
+    points = [(v.x, v.y) for v in verts_b if _contains(normals_a, offsets_a, v)]
+    points.extend((v.x, v.y) for v in verts_a if _contains(normals_b, offsets_b, v))
+    for p, q in _edges(verts_a):
+        px, py, ex, ey = p.x, p.y, q.x - p.x, q.y - p.y
+        for r, s in _edges(verts_b):
+            fx, fy = s.x - r.x, s.y - r.y
+            cross = ex * fy - ey * fx
+            if cross == 0:
+                continue
+            dx, dy = r.x - px, r.y - py
+            t = (dx * fy - dy * fx) / cross
+            u = (dx * ey - dy * ex) / cross
+            if 0 <= t <= 1 and 0 <= u <= 1:
+                points.append((px + t * ex, py + t * ey))
+    if not points:
+        return None
+    n = len(points)
+    return sum(x for x, _ in points) / n, sum(y for _, y in points) / n
+
+
+def _contains(normals, offsets, v, tol=1e-9):
+    x, y = v.x, v.y
+    return all(nx * x + ny * y - d <= tol for (nx, ny), d in zip(normals, offsets))
+
+
+def _max_separation(normals, offsets, vertices):
+    best_sep, best_normal = float("-inf"), None
+    for (nx, ny), d in zip(normals, offsets):
+        sep = min(nx * v.x + ny * v.y for v in vertices) - d
+        if sep > 0:
+            return sep, (nx, ny)
+        if sep > best_sep:
+            best_sep, best_normal = sep, (nx, ny)
+    return best_sep, best_normal
 
 
 def area(vertices):
     """
     Calcula área de polígono a partir da lista de vértices.
 
-    Assume polígono convexo enrolado de forma anti-horária.
+    Assume polígono convexo enrolado de forma anti-horária. Polígonos enrolados
+    no sentido horário possuem área negativa.
     """
-    raise NotImplementedError
+    total = 0.0
+    for (x1, y1), (x2, y2) in _edges(vertices):
+        total += x1 * y2 - x2 * y1
+    return total / 2
 
 
 def center_of_gravity(vertices):
@@ -65,4 +307,45 @@ def center_of_gravity(vertices):
 
     Assume polígono convexo enrolado de forma anti-horária.
     """
-    raise NotImplementedError
+    total = cx = cy = 0.0
+    for (x1, y1), (x2, y2) in _edges(vertices):
+        cross = x1 * y2 - x2 * y1
+        total += cross
+        cx += (x1 + x2) * cross
+        cy += (y1 + y2) * cross
+    if total == 0:
+        n = len(vertices)
+        return Vec2d(sum(x for x, _ in vertices) / n, sum(y for _, y in vertices) / n)
+    return Vec2d(cx / (3 * total), cy / (3 * total))
+
+
+def moment_per_mass(vertices):
+    """
+    Calcula momento de inércia por unidade de massa com relação à origem.
+
+    Assume polígono convexo enrolado de forma anti-horária.
+    """
+    num = den = 0.0
+    for (x1, y1), (x2, y2) in _edges(vertices):
+        cross = x1 * y2 - x2 * y1
+        num += cross * (x1 * x1 + y1 * y1 + x1 * x2 + y1 * y2 + x2 * x2 + y2 * y2)
+        den += cross
+    return num / (6 * den) if den else 0.0
+
+
+def edge_normals(vertices):
+    """
+    Lista de normais unitárias e externas a cada aresta (v[i], v[i + 1]).
+
+    Assume polígono convexo enrolado de forma anti-horária.
+    """
+    normals = []
+    for (x1, y1), (x2, y2) in _edges(vertices):
+        dx, dy = x2 - x1, y2 - y1
+        norm = sqrt(dx * dx + dy * dy)
+        normals.append((dy / norm, -dx / norm))
+    return normals
+
+
+def _edges(vertices):
+    return zip(vertices, [*vertices[1:], vertices[0]])
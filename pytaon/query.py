@@ -0,0 +1,136 @@
+"""
+Resultados e funções auxiliares para consultas geométricas (raios e segmentos).
+"""
+from math import sqrt
+
+from .vec2d import Vec2d
+
+
+class SegmentQueryInfo:
+    """
+    Resultado de uma consulta de segmento ou raio.
+
+    Atributos:
+
+    * body: corpo atingido.
+    * point: ponto de contato.
+    * normal: normal da superfície no ponto de contato.
+    * alpha: fração do segmento percorrida até o contato (entre 0 e 1).
+    """
+
+    __slots__ = ("body", "point", "normal", "alpha")
+
+    def __init__(self, body, point, normal, alpha):
+        self.body = body
+        self.point = point
+        self.normal = normal
+        self.alpha = alpha
+
+    def __repr__(self):
+        return (
+            f"SegmentQueryInfo({self.body!r}, {self.point!r}, {self.normal!r}, "
+            f"{self.alpha})"
+        )
+
+
+def segment_query_result(body, ax, ay, dx, dy, hit):
+    """
+    Cria SegmentQueryInfo a partir do resultado (t, nx, ny) de ray_circle ou
+    ray_planes, onde o raio é dado por (ax, ay) + t * (dx, dy).
+    """
+    if hit is None:
+        return None
+    t, nx, ny = hit
+    return SegmentQueryInfo(body, Vec2d(ax + t * dx, ay + t * dy), Vec2d(nx, ny), t)
+
+
+def ray_circle(ax, ay, dx, dy, cx, cy, radius):
+    """
+    Interseção do raio (ax, ay) + t * (dx, dy), com t entre 0 e 1, e o círculo
+    de centro (cx, cy).
+
+    Retorna (t, nx, ny) para o primeiro contato ou None.
+    """
+    fx, fy = ax - cx, ay - cy
+    c = fx * fx + fy * fy - radius * radius
+    if c <= 0:
+        norm = sqrt(fx * fx + fy * fy)
+        if norm == 0:
+            return 0.0, 0.0, 0.0
+        return 0.0, fx / norm, fy / norm
+
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    if a == 0 or b >= 0:
+        return None
+    delta = b * b - a * c
+    if delta < 0:
+        return None
+    t = (-b - sqrt(delta)) / a
+    if t > 1:
+        return None
+    if radius == 0:
+        return t, 0.0, 0.0
+    nx, ny = fx + t * dx, fy + t * dy
+    return t, nx / radius, ny / radius
+
+
+def ray_planes(ax, ay, dx, dy, planes):
+    """
+    Interseção do raio (ax, ay) + t * (dx, dy), com t entre 0 e 1, e a região
+    convexa definida pelos semi-planos n . p <= d, dados como (nx, ny, d).
+
+    Retorna (t, nx, ny) para o primeiro contato ou None.
+    """
+    t_enter, t_exit = 0.0, 1.0
+    normal = None
+    for nx, ny, d in planes:
+        dist = nx * ax + ny * ay - d
+        rate = nx * dx + ny * dy
+        if rate == 0:
+            if dist > 0:
+                return None
+            continue
+        t = -dist / rate
+        if rate < 0:
+            if t > t_enter:
+                t_enter, normal = t, (nx, ny)
+        elif t < t_exit:
+            t_exit = t
+        if t_enter > t_exit:
+            return None
+
+    if normal is None:
+        # Raio começa dentro da região.
+        return 0.0, 0.0, 0.0
+    return (t_enter, *normal)
+
+
+def ray_rounded_poly(ax, ay, dx, dy, vertices, planes, radius):
+    """
+    Interseção do raio (ax, ay) + t * (dx, dy), com t entre 0 e 1, e o
+    polígono convexo engrossado por radius. O polígono é dado pelos vértices
+    em ordem anti-horária e pelos semi-planos (nx, ny, d) de cada aresta
+    (v[i], v[i + 1]), com normais unitárias.
+
+    Como em Segment.segment_query(), a região é a união do polígono, de um
+    retângulo de altura radius sobre cada aresta e de um círculo em cada
+    vértice.
+
+    Retorna (t, nx, ny) para o primeiro contato ou None.
+    """
+    hits = [ray_planes(ax, ay, dx, dy, planes)]
+    if radius > 0:
+        edges = zip(planes, vertices, [*vertices[1:], vertices[0]])
+        for (nx, ny, d), (px, py), (qx, qy) in edges:
+            hits.append(ray_circle(ax, ay, dx, dy, px, py, radius))
+            ux, uy = -ny, nx
+            face = [
+                (nx, ny, d + radius),
+                (-nx, -ny, -d),
+                (ux, uy, ux * qx + uy * qy),
+                (-ux, -uy, -ux * px - uy * py),
+            ]
+            hits.append(ray_planes(ax, ay, dx, dy, face))
+    hits = [hit for hit in hits if hit is not None]
+    return min(hits, key=lambda hit: hit[0]) if hits else None
@@ -0,0 +1,153 @@
+"""
+Gravação de trajetórias em arquivos mapeados em memória.
+"""
+import mmap
+import struct
+from array import array
+
+# Cabeçalho: assinatura, versão, número de corpos, valores por corpo e número
+# de frames. O cabeçalho ocupa 32 bytes para manter os dados alinhados.
+HEADER = struct.Struct("<4sIIIQ8x")
+MAGIC = b"PTTR"
+VERSION = 1
+FIELDS = 4
+
+
+class TrajectoryRecorder:
+    """
+    Grava o estado de corpos do espaço a cada passo de simulação em um
+    arquivo mapeado em memória.
+
+    Cada frame é composto pelo tempo seguido de (x, y, vx, vy) de cada corpo
+    gravado, todos do tipo double. Um frame é gravado a cada stride passos.
+    Por padrão, são gravados todos os corpos presentes no espaço no momento
+    da criação do gravador.
+
+    O arquivo é pré-alocado para capacity frames e dobra de tamanho sempre
+    que fica cheio. Utilize Trajectory para ler o arquivo gravado.
+    """
+
+    def __init__(self, space, path, bodies=None, stride=1, capacity=1024):
+        self.space = space
+        self.path = path
+        self.bodies = list(space.bodies if bodies is None else bodies)
+        self.stride = stride
+        self.frames = 0
+        self._steps = 0
+        self._frame_size = 8 * (1 + FIELDS * len(self.bodies))
+        self._file = open(path, "w+b")
+        self._capacity = 0
+        self._mmap = None
+        self._resize(max(capacity, 1))
+        space.add_step_callback(self._on_step)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _resize(self, capacity):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.truncate(HEADER.size + capacity * self._frame_size)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._capacity = capacity
+        self._write_header()
+
+    def _write_header(self):
+        n = len(self.bodies)
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, n, FIELDS, self.frames)
+
+    def _on_step(self, space):
+        self._steps += 1
+        if self._steps % self.stride == 0:
+            self.record()
+
+    def record(self):
+        """
+        Grava o estado atual dos corpos como um novo frame.
+        """
+        if self.frames == self._capacity:
+            self._resize(2 * self._capacity)
+
+        frame = array("d", [self.space.time])
+        extend = frame.extend
+        for body in self.bodies:
+            extend((body.position_x, body.position_y, body.velocity_x, body.velocity_y))
+        start = HEADER.size + self.frames * self._frame_size
+        self._mmap[start : start + self._frame_size] = frame
+        self.frames += 1
+        self._write_header()
+
+    def close(self):
+        """
+        Interrompe a gravação e remove o espaço não utilizado do arquivo.
+        """
+        if self._mmap is None:
+            return
+        self.space.remove_step_callback(self._on_step)
+        self._mmap.close()
+        self._mmap = None
+        self._file.truncate(HEADER.size + self.frames * self._frame_size)
+        self._file.close()
+
+
+class Trajectory:
+    """
+    Leitura de arquivos gravados por TrajectoryRecorder.
+
+    O arquivo é mapeado em memória e os dados são expostos sem cópias pelo
+    atributo data, uma memoryview de doubles com a forma (frames, 1 + 4 *
+    n_bodies). Para utilizar com numpy, chame numpy.asarray(trajectory.data).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_bodies, fields, frames = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("arquivo de trajetória inválido")
+        self.n_bodies = n_bodies
+        self.frames = frames
+        row = 1 + fields * n_bodies
+        end = HEADER.size + 8 * frames * row
+        data = memoryview(self._mmap)[HEADER.size : end]
+        # memoryview não aceita formas com dimensões nulas
+        self.data = data.cast("d", (frames, row)) if frames else data.cast("d")
+
+    def __len__(self):
+        return self.frames
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def time(self, frame) -> float:
+        """
+        Tempo de simulação do frame.
+        """
+        return self.data[frame, 0]
+
+    def position(self, frame, body):
+        """
+        Posição (x, y) do corpo de índice body no frame.
+        """
+        data, col = self.data, 1 + FIELDS * body
+        return data[frame, col], data[frame, col + 1]
+
+    def velocity(self, frame, body):
+        """
+        Velocidade (vx, vy) do corpo de índice body no frame.
+        """
+        data, col = self.data, 1 + FIELDS * body
+        return data[frame, col + 2], data[frame, col + 3]
+
+    def close(self):
+        """
+        Libera o mapeamento do arquivo.
+        """
+        self.data.release()
+        self._mmap.close()
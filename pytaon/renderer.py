@@ -1,6 +1,168 @@
+"""
+Comandos de desenho pré-compilados para os corpos de um espaço.
+"""
+from functools import partial
+from operator import attrgetter
+
+from . import backend as pyxel
+from .aabb import AABB
+from .body import Body
+from .circle import Circle
+
+
 def partial_renderer(func, *args, **kwargs):
-    ...
+    """
+    Retorna comando de desenho: função sem argumentos que executa
+    func(*args, **kwargs) com os argumentos já associados.
+    """
+    return partial(func, *args, **kwargs)
+
+
+def circle_renderer(body):
+    """
+    Comando de desenho de um círculo.
+    """
+    pos = body.position
+    return partial_renderer(pyxel.circ, pos.x, pos.y, body.radius, body.color)
+
+
+def aabb_renderer(body):
+    """
+    Comando de desenho de um AABB.
+    """
+    left, bottom, right, top = body.left, body.bottom, body.right, body.top
+    return partial_renderer(
+        pyxel.rect, left, bottom, right - left, top - bottom, body.color
+    )
+
+
+def body_renderer(body):
+    """
+    Comando de desenho de um corpo genérico, representado por um pixel.
+    """
+    pos = body.position
+    return partial_renderer(pyxel.pset, pos.x, pos.y, body.color)
+
+
+# Renderizadores associados à classe que define o método draw() utilizado.
+# Corpos de outras classes utilizam o próprio método draw() como comando.
+RENDERERS = {
+    Circle: circle_renderer,
+    AABB: aabb_renderer,
+    Body: body_renderer,
+}
+
+
+def compile_command(body):
+    """
+    Retorna o comando de desenho do corpo.
+    """
+    renderer = RENDERERS.get(_draw_owner(type(body)))
+    if renderer is None:
+        return body.draw
+    return renderer(body)
+
+
+def batch_command(cls, bodies):
+    """
+    Retorna comando que desenha todos os corpos da classe cls de uma vez, com
+    cls.draw_many(). Sub-classes que redefinem draw() sem redefinir
+    draw_many() são desenhadas corpo a corpo.
+    """
+    if "draw_many" in vars(_draw_owner(cls)):
+        return partial_renderer(cls.draw_many, bodies)
+    return partial_renderer(Body.draw_many, bodies)
+
+
+def _draw_owner(cls):
+    try:
+        return _owners[cls]
+    except KeyError:
+        pass
+    owner = _owners[cls] = next(base for base in cls.__mro__ if "draw" in vars(base))
+    return owner
+
+
+_owners = {}
+
+# Estado de um corpo estático do qual depende o seu comando de desenho.
+_static_key = attrgetter("color", "left", "bottom", "right", "top")
+
+
+class Renderer:
+    """
+    Lista de comandos de desenho de um espaço, utilizada por Space.draw().
+
+    Os corpos estáticos são compilados em comandos individuais (funções com os
+    argumentos já associados) que são guardados enquanto o retângulo visível,
+    o conjunto de corpos estáticos e a cor e caixa de contorno de cada um
+    deles não mudarem. O espaço descarta os comandos ao adicionar ou remover
+    corpos estáticos e em reindex_static().
+
+    Os corpos dinâmicos e cinemáticos mudam de posição a cada passo e são
+    compilados a cada frame em um comando por classe, que desenha o grupo
+    inteiro com draw_many(). Os corpos estáticos são desenhados antes dos
+    demais e, dentro de cada grupo, os corpos seguem a ordem de space.bodies.
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self._static_view = self._static_commands = None
+        self._static_bodies = self._static_keys = None
+        self._visible = []
+
+    def invalidate(self):
+        """
+        Descarta os comandos guardados dos corpos estáticos.
+        """
+        self._static_view = self._static_commands = None
+
+    def _query(self, index, view, out):
+        order = self.space._body_ids
+        if view is None:
+            out[:] = index
+        else:
+            out.clear()
+            index.query_bb(*view, out)
+        out.sort(key=order.__getitem__)
+        return out
+
+    def commands(self, view=None) -> list:
+        """
+        Retorna a lista de comandos que desenha os corpos cuja caixa de
+        contorno intercepta view = (left, bottom, right, top) ou, se view for
+        None, todos os corpos.
+        """
+        space = self.space
+        if space._index_dirty:
+            space.reindex()
+        if view is not None:
+            view = tuple(view)
+
+        if (
+            self._static_commands is None
+            or view != self._static_view
+            or list(map(_static_key, self._static_bodies)) != self._static_keys
+        ):
+            bodies = self._query(space._static_index, view, [])
+            self._static_commands = [compile_command(body) for body in bodies]
+            self._static_bodies = bodies
+            self._static_keys = list(map(_static_key, bodies))
+            self._static_view = view
 
+        groups = {}
+        for body in self._query(space._index, view, self._visible):
+            cls = type(body)
+            try:
+                groups[cls].append(body)
+            except KeyError:
+                groups[cls] = [body]
+        batches = [batch_command(cls, group) for cls, group in groups.items()]
+        return self._static_commands + batches
 
-def circle_renderer():
-    ...
+    def draw(self, view=None):
+        """
+        Executa os comandos de desenho (veja commands()).
+        """
+        for command in self.commands(view):
+            command()
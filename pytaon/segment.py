@@ -1,51 +1,121 @@
-import pyxel
+from math import pi, sqrt
 
+from . import backend as pyxel
 from .body import Body
-from .collision import Collision
+from .query import ray_circle, ray_planes, segment_query_result
+from .vec2d import Vec2d
 
 
 class Segment(Body):
     """
-    Objeto com caixa de contorno em forma de pílula, ou seja, um segmento de reta com 
-    um determinado raio de colisão. 
+    Objeto com caixa de contorno em forma de pílula, ou seja, um segmento de reta com
+    um determinado raio de colisão.
+
+    Os extremos são armazenados com relação ao ponto médio do segmento, que
+    corresponde à posição do corpo.
     """
 
     @property
     def area(self):
-        raise NotImplementedError
+        return 2 * self.radius * self.length + pi * self.radius ** 2
 
     @property
-    def position_x(self):
-        return (self.a_x + self.b_x) / 2
-
-    @position_x.setter
-    def position_x(self, value):
-        dx = value - self.position_x
-        self.a_x += dx
-        self.b_x += dx
+    def length(self):
+        """
+        Comprimento do segmento de reta (sem contar o raio).
+        """
+        return 2 * sqrt(self._local_x ** 2 + self._local_y ** 2)
 
-    @property
-    def position_y(self):
-        raise NotImplementedError
+    a_x = property(lambda self: self.position.x - self._local_x)
+    a_y = property(lambda self: self.position.y - self._local_y)
+    b_x = property(lambda self: self.position.x + self._local_x)
+    b_y = property(lambda self: self.position.y + self._local_y)
+    a = property(lambda self: Vec2d(self.a_x, self.a_y))
+    b = property(lambda self: Vec2d(self.b_x, self.b_y))
 
-    @position_y.setter
-    def position_y(self, value):
-        raise NotImplementedError
+    right = property(lambda self: self.position.x + abs(self._local_x) + self.radius)
+    left = property(lambda self: self.position.x - abs(self._local_x) - self.radius)
+    top = property(lambda self: self.position.y + abs(self._local_y) + self.radius)
+    bottom = property(lambda self: self.position.y - abs(self._local_y) - self.radius)
 
     def __init__(self, a, b, radius, *args, **kwargs):
-        self.a_x, self.a_y = a
-        self.b_x, self.b_y = b
-        self.radius = float(self.radius)
-        super().__init__(None, *args, **kwargs)
+        a_x, a_y = a
+        b_x, b_y = b
+        self._local_x = (b_x - a_x) / 2
+        self._local_y = (b_y - a_y) / 2
+        self.radius = float(radius)
+        super().__init__(((a_x + b_x) / 2, (a_y + b_y) / 2), *args, **kwargs)
 
     def draw(self):
-        raise NotImplementedError
+        a_x, a_y, b_x, b_y = self.a_x, self.a_y, self.b_x, self.b_y
+        pyxel.line(a_x, a_y, b_x, b_y, self.color)
+        if self.radius >= 1:
+            pyxel.circ(a_x, a_y, self.radius, self.color)
+            pyxel.circ(b_x, b_y, self.radius, self.color)
 
-    def update_position(self, dt):
-        raise NotImplementedError
+    def contains_point(self, x, y):
+        ux, uy = self._local_x, self._local_y
+        dx, dy = x - self.position.x, y - self.position.y
+        norm_sqr = ux * ux + uy * uy
+        t = (dx * ux + dy * uy) / norm_sqr if norm_sqr else 0.0
+        t = max(-1.0, min(1.0, t))
+        dx, dy = dx - t * ux, dy - t * uy
+        return dx * dx + dy * dy <= self.radius * self.radius
 
-    def get_collision(self, other):
-        raise NotImplementedError
+    @classmethod
+    def contains_points(cls, bodies, xs, ys):
+        result = []
+        append = result.append
+        for body, x, y in zip(bodies, xs, ys):
+            pos, r = body.position, body.radius
+            ux, uy = body._local_x, body._local_y
+            dx, dy = x - pos.x, y - pos.y
+            norm_sqr = ux * ux + uy * uy
+            t = (dx * ux + dy * uy) / norm_sqr if norm_sqr else 0.0
+            t = -1.0 if t < -1.0 else 1.0 if t > 1.0 else t
+            dx, dy = dx - t * ux, dy - t * uy
+            append(dx * dx + dy * dy <= r * r)
+        return result
+
+    def segment_query(self, a, b, radius=0.0):
+        (ax, ay), (bx, by) = a, b
+        dx, dy = bx - ax, by - ay
+        radius += self.radius
 
-    def get_collision_aabb(self, other):
-        raise NotImplementedError
+        # A pílula é a união de dois círculos nos extremos e um retângulo.
+        hits = [
+            ray_circle(ax, ay, dx, dy, self.a_x, self.a_y, radius),
+            ray_circle(ax, ay, dx, dy, self.b_x, self.b_y, radius),
+        ]
+        half = sqrt(self._local_x ** 2 + self._local_y ** 2)
+        if half:
+            ux, uy = self._local_x / half, self._local_y / half
+            x, y = self.position.x, self.position.y
+            u, n = ux * x + uy * y, ux * y - uy * x
+            planes = [
+                (ux, uy, u + half),
+                (-ux, -uy, half - u),
+                (-uy, ux, n + radius),
+                (uy, -ux, radius - n),
+            ]
+            hits.append(ray_planes(ax, ay, dx, dy, planes))
+
+        hits = [hit for hit in hits if hit is not None]
+        hit = min(hits, key=lambda hit: hit[0]) if hits else None
+        return segment_query_result(self, ax, ay, dx, dy, hit)
+
+    def support(self, direction):
+        dx, dy = direction
+        x, y = self.position.x, self.position.y
+        if dx * self._local_x + dy * self._local_y >= 0:
+            x, y = x + self._local_x, y + self._local_y
+        else:
+            x, y = x - self._local_x, y - self._local_y
+        norm = sqrt(dx * dx + dy * dy)
+        if norm:
+            x += self.radius * dx / norm
+            y += self.radius * dy / norm
+        return Vec2d(x, y)
+
+    def get_collision(self, other):
+        return other.get_collision_segment(self)
@@ -1,20 +1,77 @@
-from typing import List
-
-import pyxel
+import gc
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from itertools import chain, count
+from math import sqrt
+from operator import le
+from typing import Iterator, List, Sequence
 
+from . import backend as pyxel
 from .body import Body
 from .circle import Circle
+from .collision import Collision, CollisionPool
+from .gjk import SeparatingAxisCache
 from .aabb import AABB
+from .ensemble import Ensemble
+from .frames import Frame, FIELDS as FRAME_FIELDS
+from .particles import ParticleSystem
 from .poly import Poly
 from .segment import Segment
+from .query import SegmentQueryInfo
+from .renderer import Renderer
+from .spatial import SpatialHash, PeriodicSpatialHash, CELL_SIZE, split
 from .vec2d import Vec2d, VecLike, asvec2d
 
 MARGIN_WIDTH = 200
 
+# Número mínimo de corpos para que o trabalho seja dividido entre threads.
+PARALLEL_MIN_BODIES = 256
+
+# Formato dos snapshots: cabeçalho (assinatura, versão, número de corpos,
+# tempo) seguido por SNAPSHOT_FIELDS valores do tipo double para cada corpo.
+SNAPSHOT_HEADER = struct.Struct("<4sIId")
+SNAPSHOT_MAGIC = b"PTSN"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_FIELDS = 14
+
 
 class Space:
     """
     Representa um grupo de objetos que interagem entre si.
+
+    O espaço mantém um índice espacial (grade uniforme com células de tamanho
+    cell_size) que é utilizado na detecção de colisões e nas consultas. O
+    índice é atualizado a cada passo de simulação. Corpos movidos diretamente
+    pelo usuário só são reconhecidos pelas consultas após o próximo passo ou
+    uma chamada explícita a reindex().
+
+    Corpos estáticos (Body.STATIC) são guardados em um índice separado,
+    construído à medida que são adicionados. Eles não são integrados e nunca
+    são testados entre si. Caso um corpo estático seja movido, chame
+    reindex_static(). Corpos cinemáticos (Body.KINEMATIC) têm a posição
+    integrada a partir da velocidade, mas não sofrem a ação de forças nem de
+    colisões.
+
+    Objetos adicionados ou removidos durante um passo de simulação (por
+    exemplo, a partir de um handler de colisão) só são efetivamente
+    adicionados ou removidos ao final do passo.
+
+    As margens refletem os corpos que tentam sair do espaço. No modo periódico
+    (periodic=True), o retângulo definido pelas quatro margens se repete
+    indefinidamente: corpos que saem por uma margem reaparecem na oposta e as
+    colisões consideram a imagem mais próxima de cada corpo.
+
+    Se executor for um ThreadPoolExecutor (ou um número de threads), a
+    avaliação das funções de força e a detecção de colisões (fases larga e
+    estreita) são divididas em blocos executados em paralelo. Os resultados
+    são combinados na ordem dos blocos, de forma que a simulação é idêntica
+    à serial. Há ganho apenas quando as funções liberam o GIL ou em builds do
+    CPython sem GIL. O modo periódico sempre detecta colisões em série.
+    O trabalho é dividido em um bloco por thread do executor. Um executor
+    criado a partir de um número de threads pertence ao espaço e é encerrado
+    por close() ou ao final de um bloco with.
     """
 
     bodies: List[Body]
@@ -28,6 +85,9 @@ class Space:
         margin_right=None,
         margin_top=None,
         margin_bottom=None,
+        cell_size=CELL_SIZE,
+        periodic=False,
+        executor=None,
     ):
         self.time = 0.0
         self.current_time_step = 0.0
@@ -39,9 +99,63 @@ class Space:
         self.margin_left = margin_left
         self.margin_top = margin_top
         self.margin_bottom = margin_bottom
+        self._handlers = {}
+        self._wildcard_handlers = {}
+        self._default_handler = CollisionHandler()
+        self._handler_table = {}
+        self._collision_pool = CollisionPool()
+        self._axis_cache = SeparatingAxisCache()
+        self._collisions = []
+        self._body_ids = {}
+        self._dynamic_bodies = {}
+        self._kinematic_bodies = {}
+        self._locked = False
+        self._pending = []
+        self._particle_systems = []
+        self._step_callbacks = []
+        self._owns_executor = isinstance(executor, int)
+        if self._owns_executor:
+            self._threads = executor
+            executor = ThreadPoolExecutor(max_workers=executor)
+        else:
+            workers = getattr(executor, "_max_workers", None)
+            self._threads = workers or os.cpu_count() or 1
+        self.executor = executor
+        self._pools = []
+        self.renderer = Renderer(self)
+        self.periodic = periodic
+        if periodic:
+            margins = (margin_left, margin_bottom, margin_right, margin_top)
+            if None in margins:
+                raise ValueError("modo periódico exige todas as margens")
+            width, height = margin_right - margin_left, margin_top - margin_bottom
+            period = (margin_left, margin_bottom, width, height)
+            self._index = PeriodicSpatialHash(cell_size, period)
+            self._static_index = PeriodicSpatialHash(cell_size, period)
+        else:
+            self._index = SpatialHash(cell_size)
+            self._static_index = SpatialHash(cell_size)
+        self._indexes = (self._index, self._static_index)
+        self._index_dirty = False
 
     def __contains__(self, body):
-        return body in self.bodies
+        return body in self._body_ids
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Encerra o executor criado pelo espaço, caso exista. O espaço continua
+        utilizável, mas passa a executar os passos em série.
+        """
+        if self._owns_executor:
+            self.executor.shutdown()
+            self.executor = None
+            self._owns_executor = False
 
     #
     # Criação e remoção de objetos
@@ -50,7 +164,55 @@ class Space:
         """
         Adiciona objeto ao espaço.
         """
+        if self._locked:
+            self._pending.append((self.add, body))
+            return
+        if body in self._body_ids:
+            raise ValueError("objeto já pertence ao espaço")
+
+        self._body_ids[body] = len(self.bodies)
         self.bodies.append(body)
+        body_type = body.body_type
+        if body_type == Body.STATIC:
+            self._static_index.insert(body)
+            self.renderer.invalidate()
+            return
+        if body_type == Body.DYNAMIC:
+            self._dynamic_bodies[body] = None
+        else:
+            self._kinematic_bodies[body] = None
+        self._index.insert(body)
+
+    def add_many(self, bodies):
+        """
+        Adiciona todos os objetos da sequência ao espaço.
+        """
+        if self._locked:
+            self._pending.extend((self.add, body) for body in bodies)
+            return
+
+        body_ids, all_bodies = self._body_ids, self.bodies
+        bodies = list(bodies)
+        if len(set(bodies)) != len(bodies) or any(map(body_ids.__contains__, bodies)):
+            raise ValueError("objeto já pertence ao espaço")
+
+        moving, static = [], []
+        for body in bodies:
+            body_ids[body] = len(all_bodies)
+            all_bodies.append(body)
+            body_type = body.body_type
+            if body_type == Body.STATIC:
+                static.append(body)
+            else:
+                moving.append(body)
+                if body_type == Body.DYNAMIC:
+                    self._dynamic_bodies[body] = None
+                else:
+                    self._kinematic_bodies[body] = None
+        self._index.insert_many(moving)
+        if static:
+            self._static_index.insert_many(static)
+            self.renderer.invalidate()
 
     def _add_object(self, cls, *args, **kwargs) -> Body:
         obj = cls(*args, **kwargs)
@@ -81,18 +243,392 @@ class Space:
         """
         return self._add_object(Segment, *args, **kwargs)
 
+    def add_circles(
+        self, radius, pos, vel=None, mass=1.0, color=0, **kwargs
+    ) -> List[Circle]:
+        """
+        Cria vários círculos e adiciona ao espaço.
+
+        pos é uma sequência de pares (x, y) com a posição de cada círculo.
+        vel, se fornecido, é uma sequência de pares com as velocidades.
+        radius, mass e color podem ser um único valor, compartilhado por todos
+        os círculos, ou uma sequência com um valor por círculo. Os demais
+        argumentos são repassados ao construtor e valem para todos.
+        """
+        if not len(pos):
+            return []
+        columns = {"position": pos}
+        if vel is not None:
+            columns["velocity"] = vel
+        radius = _column(columns, "radius", radius)
+        mass = _column(columns, "mass", mass, float)
+        color = _column(columns, "color", color)
+        proto = Circle(radius, mass=mass, color=color, **kwargs)
+        return self._add_replicas(proto, columns)
+
+    def add_aabbs(
+        self, left, bottom, right, top, vel=None, mass=1.0, color=0, **kwargs
+    ) -> List[AABB]:
+        """
+        Cria várias AABBs e adiciona ao espaço.
+
+        left, bottom, right e top são sequências com os limites de cada AABB.
+        Os demais argumentos são tratados como em add_circles().
+        """
+        if not len(left):
+            return []
+        if not all(map(le, left, right)) or not all(map(le, bottom, top)):
+            raise ValueError("limites inválidos")
+        columns = {
+            "left": left,
+            "right": right,
+            "bottom": bottom,
+            "top": top,
+            "position": [
+                ((l + r) / 2, (b + t) / 2)
+                for l, b, r, t in zip(left, bottom, right, top)
+            ],
+        }
+        if vel is not None:
+            columns["velocity"] = vel
+        mass = _column(columns, "mass", mass, float)
+        color = _column(columns, "color", color)
+        proto = AABB(0, 0, 0, 0, mass=mass, color=color, **kwargs)
+        return self._add_replicas(proto, columns)
+
+    def _add_replicas(self, proto, columns):
+        # Coletas de lixo disparadas pela criação de muitos objetos dominam o
+        # custo da construção em lote.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            bodies = proto.replicate(**columns)
+            self.add_many(bodies)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return bodies
+
+    def add_particle_system(self, *args, **kwargs) -> ParticleSystem:
+        """
+        Cria sistema de partículas, que é atualizado e desenhado junto com o
+        espaço.
+        """
+        particles = ParticleSystem(*args, **kwargs)
+        self._particle_systems.append(particles)
+        return particles
+
+    def ensemble(self, k) -> Ensemble:
+        """
+        Cria um Ensemble com k cópias do estado atual do espaço, que podem
+        ser simuladas simultaneamente a partir de condições iniciais
+        diferentes.
+        """
+        return Ensemble(self, k)
+
     def remove(self, obj):
         """
         Remove objeto da simulação.
+
+        A remoção custa O(1): o último objeto de space.bodies passa a ocupar a
+        posição do objeto removido.
         """
-        raise NotImplementedError
+        if self._locked:
+            self._pending.append((self.remove, obj))
+            return
+        body_ids = self._body_ids
+        try:
+            idx = body_ids.pop(obj)
+        except KeyError:
+            raise ValueError("objeto não pertence ao espaço") from None
+
+        bodies = self.bodies
+        last = bodies.pop()
+        if last is not obj:
+            bodies[idx] = last
+            body_ids[last] = idx
+
+        body_type = obj.body_type
+        if body_type == Body.STATIC:
+            self._static_index.remove(obj)
+            self.renderer.invalidate()
+            return
+        if body_type == Body.DYNAMIC:
+            del self._dynamic_bodies[obj]
+        else:
+            del self._kinematic_bodies[obj]
+        self._index.remove(obj)
+
+    def remove_many(self, bodies):
+        """
+        Remove todos os objetos da sequência do espaço.
+        """
+        for body in bodies:
+            self.remove(body)
 
     # Verifica colisões e pontos
     def point_query(self, vec: VecLike) -> List[Body]:
         """
         Retorna a lista de todos objetos que tocam o ponto dado.
         """
-        raise NotImplementedError
+        x, y = vec
+        if self._index_dirty:
+            self.reindex()
+        return [
+            body
+            for index in self._indexes
+            for body in index.query_point(x, y)
+            if body.contains_point(x, y)
+        ]
+
+    def point_query_many(self, points: Sequence[VecLike]):
+        """
+        Versão em lote de point_query para uma sequência de pontos.
+
+        Retorna o par (offsets, indices) no formato CSR: os índices (em
+        space.bodies) dos objetos que contêm o i-ésimo ponto são
+        indices[offsets[i]:offsets[i + 1]], em ordem crescente.
+
+        Os candidatos de todos os pontos são obtidos do índice espacial e
+        agrupados por tipo de objeto, de forma que o teste exato seja feito
+        por um único laço especializado (Body.contains_points) para cada tipo.
+        """
+        if self._index_dirty:
+            self.reindex()
+        n_points, groups = self._index.query_points(points)
+        if self._static_index:
+            _, static_groups = self._static_index.query_points(points)
+            for cls, static_group in static_groups.items():
+                group = groups.setdefault(cls, ([], [], [], []))
+                for items, static_items in zip(group, static_group):
+                    items.extend(static_items)
+
+        # Testes exatos por tipo
+        body_ids = self._body_ids
+        hits_point, hits_body = [], []
+        for cls, (point_ids, bodies, xs, ys) in groups.items():
+            for n, body, inside in zip(
+                point_ids, bodies, cls.contains_points(bodies, xs, ys)
+            ):
+                if inside:
+                    hits_point.append(n)
+                    hits_body.append(body_ids[body])
+
+        # Monta representação CSR
+        offsets = array("l", [0]) * (n_points + 1)
+        for n in hits_point:
+            offsets[n + 1] += 1
+        for n in range(n_points):
+            offsets[n + 1] += offsets[n]
+        indices = array("l", [i for _, i in sorted(zip(hits_point, hits_body))])
+        return offsets, indices
+
+    def segment_query(
+        self, a: VecLike, b: VecLike, radius=0.0
+    ) -> List[SegmentQueryInfo]:
+        """
+        Retorna a lista de contatos entre o segmento de a até b, engrossado
+        pelo raio dado, e os objetos do espaço, ordenada pela fração alpha
+        percorrida ao longo do segmento.
+        """
+        (ax, ay), (bx, by) = a, b
+        if self._index_dirty:
+            self.reindex()
+
+        result = []
+        for index in self._indexes:
+            for bodies, _, _ in index.traverse(ax, ay, bx, by, radius):
+                for body in bodies:
+                    info = body.segment_query(a, b, radius)
+                    if info is not None:
+                        result.append(info)
+        result.sort(key=lambda info: info.alpha)
+        return result
+
+    def ray_cast_first(self, a: VecLike, b: VecLike) -> SegmentQueryInfo:
+        """
+        Retorna o primeiro contato do raio que parte de a em direção a b ou
+        None caso o raio não toque nenhum objeto.
+
+        As células do índice são visitadas na ordem do raio e a busca termina
+        assim que o contato encontrado estiver antes da próxima célula.
+        """
+        (ax, ay), (bx, by) = a, b
+        if self._index_dirty:
+            self.reindex()
+
+        best = None
+        for index in self._indexes:
+            for bodies, t_enter, t_exit in index.traverse(ax, ay, bx, by):
+                if best is not None and best.alpha <= t_enter:
+                    break
+                for body in bodies:
+                    info = body.segment_query(a, b)
+                    if info is not None and (best is None or info.alpha < best.alpha):
+                        best = info
+                if best is not None and best.alpha <= t_exit:
+                    break
+        return best
+
+    def bb_query(self, left, bottom, right, top, out=None) -> List[Body]:
+        """
+        Retorna a lista de objetos cuja caixa de contorno intercepta o
+        retângulo dado.
+
+        Se out for fornecido, a lista é limpa e reutilizada para guardar o
+        resultado, evitando alocações em consultas repetidas.
+        """
+        if out is None:
+            out = []
+        else:
+            out.clear()
+        if self._index_dirty:
+            self.reindex()
+        for index in self._indexes:
+            index.query_bb(left, bottom, right, top, out)
+        return out
+
+    def nearest(self, point: VecLike, k=1, max_distance=None, out=None) -> List[Body]:
+        """
+        Retorna a lista dos k objetos mais próximos do ponto, ordenada pela
+        distância entre o ponto e a caixa de contorno de cada objeto. Objetos
+        a uma distância maior que max_distance são ignorados.
+
+        Se out for fornecido, a lista é limpa e reutilizada para guardar o
+        resultado, evitando alocações em consultas repetidas.
+        """
+        if out is None:
+            out = []
+        else:
+            out.clear()
+        if self._index_dirty:
+            self.reindex()
+        x, y = point
+        if not self._static_index:
+            return self._index.nearest(x, y, k, max_distance, out)
+
+        # Combina os k mais próximos de cada índice.
+        def distance(body):
+            dx = max(body.left - x, 0.0, x - body.right)
+            dy = max(body.bottom - y, 0.0, y - body.top)
+            return sqrt(dx * dx + dy * dy)
+
+        # Cada índice precisa de uma lista própria: SpatialHash.nearest() para
+        # assim que a lista recebida possuir k elementos.
+        found = []
+        for index in self._indexes:
+            part = []
+            index.nearest(x, y, k, max_distance, part)
+            found.extend(part)
+        found.sort(key=distance)
+        out.extend(found[:k])
+        return out
+
+    def reindex(self):
+        """
+        Atualiza o índice espacial com as posições atuais dos corpos dinâmicos
+        e cinemáticos.
+        """
+        update = self._index.update
+        for body in chain(self._dynamic_bodies, self._kinematic_bodies):
+            update(body)
+        self._index_dirty = False
+
+    def reindex_static(self):
+        """
+        Reconstrói o índice de corpos estáticos. Só é necessário caso algum
+        corpo estático tenha sido movido.
+        """
+        index = self._static_index
+        bodies = list(index)
+        index.clear()
+        for body in bodies:
+            index.insert(body)
+        self.renderer.invalidate()
+
+    #
+    # Snapshots
+    #
+    def snapshot(self) -> bytes:
+        """
+        Retorna representação binária compacta do estado dinâmico do espaço:
+        tempo e, para cada corpo, posição, velocidade, força acumulada, massa,
+        amortecimento, restituição, gravidade e cor.
+
+        O buffer pode ser restaurado com restore() enquanto o espaço possuir
+        os mesmos corpos na mesma ordem. Os valores são gravados na ordem de
+        bytes nativa da máquina.
+        """
+        nan = float("nan")
+        data = array("d")
+        extend = data.extend
+        for body in self.bodies:
+            # AABBs guardam os limites: a posição é derivada deles.
+            if isinstance(body, AABB):
+                a, b, c, d = body.left, body.bottom, body.right, body.top
+            else:
+                pos = body.position
+                a, b, c, d = pos.x, pos.y, 0.0, 0.0
+            vel, force, gravity = body.velocity, body.force, body.gravity
+            damping, restitution = body.damping, body.restitution
+            gx, gy = (nan, nan) if gravity is None else (gravity.x, gravity.y)
+            extend((a, b, c, d, vel.x, vel.y, force.x, force.y, body.mass))
+            extend(
+                (
+                    nan if damping is None else damping,
+                    nan if restitution is None else restitution,
+                    gx,
+                    gy,
+                    body.color,
+                )
+            )
+        header = SNAPSHOT_HEADER.pack(
+            SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(self.bodies), self.time
+        )
+        return header + data.tobytes()
+
+    def restore(self, buf):
+        """
+        Restaura o estado gravado por snapshot(), sem recriar os corpos.
+        """
+        magic, version, n, time = SNAPSHOT_HEADER.unpack_from(buf)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError("snapshot inválido")
+        if n != len(self.bodies):
+            raise ValueError("snapshot não corresponde aos corpos do espaço")
+
+        data = array("d")
+        data.frombytes(memoryview(buf)[SNAPSHOT_HEADER.size :])
+        values = data.tolist()
+        if len(values) != n * SNAPSHOT_FIELDS:
+            raise ValueError("snapshot inválido")
+
+        rows = zip(*[iter(values)] * SNAPSHOT_FIELDS)
+        for body, row in zip(self.bodies, rows):
+            a, b, c, d, vx, vy, fx, fy, mass = row[:9]
+            damping, restitution, gx, gy, color = row[9:]
+            if isinstance(body, AABB):
+                body.left, body.bottom, body.right, body.top = a, b, c, d
+            else:
+                pos = body.position
+                pos.x, pos.y = a, b
+            vel, force = body.velocity, body.force
+            vel.x, vel.y = vx, vy
+            force.x, force.y = fx, fy
+            body.mass = mass
+            body.damping = None if damping != damping else damping
+            body.restitution = None if restitution != restitution else restitution
+            if gx != gx:
+                body.gravity = None
+            elif body.gravity is None:
+                body.gravity = Vec2d(gx, gy)
+            else:
+                body.gravity.x, body.gravity.y = gx, gy
+            body.color = int(color)
+
+        self.time = time
+        self._index_dirty = True
+        self.reindex_static()
 
     #
     # Simulação
@@ -101,91 +637,348 @@ class Space:
         """
         Executa um passo de simulação.
         """
+        self._locked = True
+        try:
+            self._step(dt)
+        finally:
+            self._locked = False
+            if self._pending:
+                self._flush_pending()
+        for func in self._step_callbacks:
+            func(self)
+
+    def iter_steps(
+        self, dt, n=None, stride=1, fields=("position", "velocity")
+    ) -> Iterator[Frame]:
+        """
+        Retorna gerador que executa passos de simulação sob demanda e produz
+        um Frame a cada stride passos, com os campos requisitados (veja Frame).
+
+        Se n for None, a simulação continua indefinidamente: utilize
+        itertools.islice(), takewhile(), etc. para interrompê-la. Os passos
+        só são executados quando o próximo frame é requisitado. Os argumentos
+        são validados imediatamente, antes do primeiro passo.
+        """
+        fields = tuple(fields)
+        for field in fields:
+            if field not in FRAME_FIELDS:
+                raise ValueError(f"campo inválido: {field!r}")
+        if stride < 1:
+            raise ValueError("stride deve ser positivo")
+        if n is not None and n < 0:
+            raise ValueError("n não pode ser negativo")
+        return self._iter_steps(dt, n, stride, fields)
+
+    def _iter_steps(self, dt, n, stride, fields):
+        steps = count(1) if n is None else range(1, n + 1)
+        for i in steps:
+            self.step(dt)
+            if i % stride == 0:
+                yield Frame.from_space(self, i, fields)
+
+    async def run_async(
+        self, dt, tick_rate=None, ticks=None, on_tick=None, executor=None
+    ) -> int:
+        """
+        Corrotina que executa passos de tamanho dt a tick_rate passos por
+        segundo (por padrão, 1 / dt), até completar ticks passos ou ser
+        cancelada. Retorna o número de passos executados.
+
+        Os instantes de cada passo são calculados a partir do início da
+        execução, de forma que atrasos não se acumulam. Passos atrasados em
+        mais de um período são executados imediatamente e o relógio é
+        reiniciado, sem rajadas para recuperar o atraso.
+
+        Cada passo é executado em uma thread do executor dado (ou do executor
+        padrão do loop), o que mantém o loop livre para tratar eventos de
+        rede. Após cada passo, on_tick(space, tick) é chamada no loop e pode
+        ser uma corrotina, por exemplo, para publicar snapshot(). Modifique o
+        espaço apenas em on_tick ou em callbacks do próprio passo.
+        """
+        import asyncio
+        import inspect
+
+        loop = asyncio.get_running_loop()
+        period = 1 / (1 / dt if tick_rate is None else tick_rate)
+        deadline = loop.time()
+        tick = 0
+        while ticks is None or tick < ticks:
+            await loop.run_in_executor(executor, self.step, dt)
+            tick += 1
+            if on_tick is not None:
+                result = on_tick(self, tick)
+                if inspect.isawaitable(result):
+                    await result
+
+            deadline += period
+            now = loop.time()
+            if deadline < now - period:
+                deadline = now
+            elif ticks is None or tick < ticks:
+                await asyncio.sleep(deadline - now)
+        return tick
+
+    def add_step_callback(self, func):
+        """
+        Registra função do tipo fn(space) executada ao final de cada passo de
+        simulação.
+        """
+        self._step_callbacks.append(func)
+        return func
+
+    def remove_step_callback(self, func):
+        """
+        Remove função registrada com add_step_callback().
+        """
+        self._step_callbacks.remove(func)
+
+    def _flush_pending(self):
+        """
+        Executa as adições e remoções requisitadas durante o passo.
+        """
+        pending = self._pending
+        self._pending = []
+        for method, body in pending:
+            method(body)
+
+    def _step(self, dt):
         self.current_time_step = dt
 
         # Aplica as forças a partir de funções de força
         time = self.time
-        for body in self.bodies:
-            fn = body.force_func
-            if fn is not None:
-                force = fn(body, time)
-                body.apply_force(force)
+        dynamic_bodies = self._dynamic_bodies
+        forced = [body for body in dynamic_bodies if body.force_func is not None]
+        if self.executor is not None and len(forced) >= PARALLEL_MIN_BODIES:
+            chunks = split(forced, self._threads)
+            list(self.executor.map(_apply_force_funcs, chunks, [time] * len(chunks)))
+        else:
+            _apply_force_funcs(forced, time)
 
         # Atualiza as velocidades dos corpos em função das forças acumuladas.
         global_damping = self.damping or 0.0
         global_gravity = self.gravity or Vec2d(0, 0)
-        for body in self.bodies:
+        for body in dynamic_bodies:
             damping = global_damping if body.damping is None else body.damping
             gravity = global_gravity if body.gravity is None else body.gravity
             body._update_velocity_(gravity, damping, dt)
 
         # Resolve as colisões.
+        table = self._handler_table
         for collision in self.get_collisions():
-            collision.resolve()
+            key = (type(collision.body_a), type(collision.body_b))
+            try:
+                handler, swap = table[key]
+            except KeyError:
+                handler, swap = table[key] = self._find_handler(*key)
+            if swap:
+                collision.swap()
+            if handler.pre_solve(collision):
+                collision.resolve()
+                handler.post_solve(collision)
+        self._apply_collision_with_margins()
 
         # Finalmente atualiza as posições.
-        for body in self.bodies:
+        for body in chain(dynamic_bodies, self._kinematic_bodies):
             body._update_position_(dt)
+        if self.periodic:
+            self._wrap_positions()
+        for particles in self._particle_systems:
+            particles.step(dt, global_gravity, global_damping)
 
         self.time += dt
+        self._index_dirty = True
 
-    def get_collisions(self):
+    def get_collisions(self) -> List[Collision]:
         """
-        Retorna sequência de colisões para o frame.
+        Retorna lista de colisões para o frame.
+
+        As colisões são retiradas do pool do espaço e são sobrescritas na
+        próxima chamada. Utilize Collision.copy() para guardá-las.
         """
-        for i, obj_a in enumerate(self.bodies):
-            for obj_b in self.bodies[i + 1 :]:
-                col = obj_a.get_collision(obj_b)
-                if col is not None:
-                    yield col
+        pool = self._collision_pool
+        pool.reset()
+        collisions = self._collisions
+        collisions.clear()
+        self._axis_cache.advance()
 
-        self._apply_collision_with_margins()
+        # Corpos podem ter sido movidos pelo usuário desde o último passo.
+        self.reindex()
+        index = self._index
+        parallel = self.executor is not None and not self.periodic
+        if parallel and len(index) >= PARALLEL_MIN_BODIES:
+            for chunk in self._get_collisions_parallel():
+                collisions.extend(chunk)
+            return collisions
+
+        pairs = chain(index.pairs(), index.pairs_with(self._static_index))
+        with pool, self._axis_cache:
+            return self._narrowphase(pairs, collisions)
+
+    def _get_collisions_parallel(self):
+        """
+        Divide a detecção de colisões em tarefas executadas pelo executor.
+        Cada tarefa percorre um bloco de células do índice ou um bloco de
+        pares com corpos estáticos e utiliza um pool de colisões próprio.
+        Retorna as listas de colisões de cada tarefa, na ordem serial.
+        """
+        index, n = self._index, self._threads
+        static_pairs = list(index.pairs_with(self._static_index))
+        tasks = [index.pairs(cells) for cells in index.cell_chunks(n)]
+        tasks.extend(split(static_pairs, n))
+
+        pools = self._pools
+        while len(pools) < len(tasks):
+            pools.append(CollisionPool())
+        for pool in pools:
+            pool.reset()
+        return self.executor.map(self._collision_task, pools[: len(tasks)], tasks)
+
+    def _collision_task(self, pool, pairs):
+        with pool, self._axis_cache:
+            return self._narrowphase(pairs, [])
+
+    def _narrowphase(self, pairs, collisions) -> List[Collision]:
+        """
+        Filtra os pares e acrescenta as colisões encontradas à lista.
+        """
+        periodic = self.periodic
+        dynamic = Body.DYNAMIC
+        for obj_a, obj_b in pairs:
+            # Filtra pares antes de calcular a colisão
+            if obj_a.body_type != dynamic and obj_b.body_type != dynamic:
+                continue
+            group = obj_a.group
+            if group and group == obj_b.group:
+                continue
+            if not (obj_a.category & obj_b.mask and obj_b.category & obj_a.mask):
+                continue
+            if periodic:
+                col = self._get_collision_periodic(obj_a, obj_b)
+            else:
+                col = obj_a.get_collision(obj_b)
+            if col is not None:
+                collisions.append(col)
+        return collisions
 
     def _apply_collision_with_margins(self):
-        # Margem esquerda
-        if self.margin_left is not None:
-            margin = self.margin_left
-            for body in self.bodies:
-                if body.left <= margin:
-                    e = body.restitution
-                    body.velocity.y *= -1 if e is None else -e
+        """
+        Reflete a velocidade dos corpos que ultrapassam as margens em direção
+        ao exterior do espaço, utilizando o coeficiente de restituição de cada
+        corpo (ou do espaço).
 
-        # Margem direita
-        NotImplemented
+        Todas as margens são tratadas em uma única passagem sobre as caixas de
+        contorno guardadas no índice espacial.
+        """
+        left, right = self.margin_left, self.margin_right
+        bottom, top = self.margin_bottom, self.margin_top
+        if self.periodic or left is right is bottom is top is None:
+            return
 
-        # Margem superior
-        NotImplemented
+        inf = float("inf")
+        left = -inf if left is None else left
+        right = inf if right is None else right
+        bottom = -inf if bottom is None else bottom
+        top = inf if top is None else top
+        restitution = self.restitution
+        dynamic = Body.DYNAMIC
 
-        # Margem inferior
-        NotImplemented
+        for body, (b_left, b_bottom, b_right, b_top) in self._index.iter_bounds():
+            if left < b_left and b_right < right and bottom < b_bottom and b_top < top:
+                continue
+            if body.body_type != dynamic:
+                continue
+
+            vel = body.velocity
+            e = restitution if body.restitution is None else body.restitution
+            if (b_left <= left and vel.x < 0) or (b_right >= right and vel.x > 0):
+                vel.x *= -e
+            if (b_bottom <= bottom and vel.y < 0) or (b_top >= top and vel.y > 0):
+                vel.y *= -e
+
+    def _wrap_positions(self):
+        """
+        Modo periódico: corpos cujo centro sai do espaço reaparecem na margem
+        oposta.
+        """
+        left, bottom, width, height = self._index.period
+        right, top = left + width, bottom + height
+        for body in chain(self._dynamic_bodies, self._kinematic_bodies):
+            x, y = body.position_x, body.position_y
+            if x < left:
+                body.position_x = x + width
+            elif x >= right:
+                body.position_x = x - width
+            if y < bottom:
+                body.position_y = y + height
+            elif y >= top:
+                body.position_y = y - height
+
+    def _get_collision_periodic(self, obj_a, obj_b):
+        """
+        Calcula colisão entre a e a imagem de b mais próxima de a.
+        """
+        # Corpos estáticos só aparecem como segundo corpo (pairs_with).
+        if obj_b.body_type == Body.STATIC:
+            dx, dy = self._index.minimum_image(obj_a, obj_b, self._static_index)
+        else:
+            dx, dy = self._index.minimum_image(obj_a, obj_b)
+        if not (dx or dy):
+            return obj_a.get_collision(obj_b)
+
+        x, y = obj_b.position_x, obj_b.position_y
+        obj_b.position_x, obj_b.position_y = x + dx, y + dy
+        try:
+            return obj_a.get_collision(obj_b)
+        finally:
+            obj_b.position_x, obj_b.position_y = x, y
 
     #
     # Outras funções
     #
-    def draw(self, *, background=None):
+    def draw(self, *, background=None, view=None, cull=True):
         """
-        Desenha o espaço chamando a função .draw() de cada elemento do espaço.
+        Desenha o espaço executando a lista de comandos de desenho do
+        renderizador (veja Renderer).
+
+        Apenas os corpos cuja caixa de contorno intercepta o retângulo
+        view = (left, bottom, right, top) são desenhados. Por padrão, view é
+        a tela do Pyxel: caso utilize pyxel.camera(), passe o retângulo visto
+        pela câmera. Com cull=False, todos os corpos são desenhados.
         """
 
         if background is not None:
             pyxel.cls(background)
 
-        for body in self.bodies:
-            body.draw()
+        for particles in self._particle_systems:
+            particles.draw()
+
+        if not cull:
+            view = None
+        elif view is None:
+            view = (0, 0, pyxel.width, pyxel.height)
+        for command in self.renderer.commands(view):
+            command()
 
     def add_default_collision_handler(self, pre_solve=None, post_solve=None):
         """
         Registra o CollisionHandler padrão para colisões que não possuem um 
         método mais específico associado. 
         """
-        raise NotImplementedError
+        self._default_handler = handler = CollisionHandler(pre_solve, post_solve)
+        self._handler_table.clear()
+        return handler
 
     def add_wildcard_collision_handler(self, col_type, pre_solve=None, post_solve=None):
         """
-        Registra o CollisionHandler padrão para colisões que não possuem um 
-        método mais específico associado. 
+        Registra o CollisionHandler para colisões envolvendo col_type e qualquer
+        outro tipo que não possua um método mais específico associado.
+
+        O primeiro corpo da colisão passada ao handler é sempre do tipo col_type.
         """
-        raise NotImplementedError
+        handler = CollisionHandler(pre_solve, post_solve)
+        self._wildcard_handlers[col_type] = handler
+        self._handler_table.clear()
+        return handler
 
     def add_collision_handler(
         self, col_type_a, col_type_b, pre_solve=None, post_solve=None
@@ -194,8 +987,55 @@ class Space:
         Retorna um CollisionHandler para colisões entre col_type_a e 
         col_type_b. Os tipos equivalem às classes dos objetos e não 
         consideram sub-classes.
+
+        Os corpos da colisão passada ao handler estão na mesma ordem dos tipos.
+        """
+        handler = CollisionHandler(pre_solve, post_solve)
+        self._handlers[col_type_a, col_type_b] = handler
+        self._handler_table.clear()
+        return handler
+
+    def _find_handler(self, type_a, type_b):
+        """
+        Retorna o par (handler, swap) para colisões entre os tipos dados, onde
+        swap indica se a ordem dos corpos deve ser invertida.
+
+        O resultado é guardado em uma tabela para que o despacho de cada
+        colisão custe uma única consulta a dicionário.
         """
-        raise NotImplementedError
+        handlers = self._handlers
+        if (type_a, type_b) in handlers:
+            return handlers[type_a, type_b], False
+        if (type_b, type_a) in handlers:
+            return handlers[type_b, type_a], True
+
+        wildcards = self._wildcard_handlers
+        if type_a in wildcards:
+            return wildcards[type_a], False
+        if type_b in wildcards:
+            return wildcards[type_b], True
+        return self._default_handler, False
+
+
+def _apply_force_funcs(bodies, time):
+    """
+    Aplica a força calculada pela função de força de cada corpo.
+    """
+    for body in bodies:
+        body.apply_force(body.force_func(body, time))
+
+
+def _column(columns, name, value, convert=None):
+    """
+    Registra value em columns caso seja uma sequência e retorna o valor a ser
+    utilizado pelo protótipo em add_circles()/add_aabbs().
+    """
+    if not hasattr(value, "__len__"):
+        return value
+    if convert is not None:
+        value = list(map(convert, value))
+    columns[name] = value
+    return value[0]
 
 
 class CollisionHandler:
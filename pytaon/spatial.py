@@ -0,0 +1,535 @@
+"""
+Índices espaciais utilizados para acelerar consultas e a detecção de colisões.
+"""
+from heapq import heappush, heappop
+from math import floor, sqrt
+
+CELL_SIZE = 32.0
+
+
+def split(items, n):
+    """
+    Divide a sequência em até n blocos contíguos de tamanhos semelhantes.
+    """
+    size = -(-len(items) // n) or 1
+    return [items[k : k + size] for k in range(0, len(items), size)]
+
+
+class SpatialHash:
+    """
+    Grade uniforme que associa cada célula aos corpos cuja caixa de contorno
+    (left, bottom, right, top) toca a célula.
+
+    O índice é incremental: update(body) só modifica as células quando o
+    corpo passa a ocupar um conjunto diferente de células.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self._size_x = self._size_y = self.cell_size
+        self._inv_x = self._inv_y = 1 / self.cell_size
+        self._cells = {}
+        self._ranges = {}
+        self._bounds = {}
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def __contains__(self, body):
+        return body in self._ranges
+
+    def __iter__(self):
+        return iter(self._ranges)
+
+    def _cell_range(self, left, bottom, right, top):
+        inv_x, inv_y = self._inv_x, self._inv_y
+        return (
+            floor(left * inv_x),
+            floor(bottom * inv_y),
+            floor(right * inv_x),
+            floor(top * inv_y),
+        )
+
+    def iter_bounds(self):
+        """
+        Itera sobre pares (body, (left, bottom, right, top)) com as caixas de
+        contorno registradas na última atualização do índice.
+        """
+        return self._bounds.items()
+
+    def insert(self, body):
+        """
+        Insere corpo no índice.
+        """
+        bounds = (body.left, body.bottom, body.right, body.top)
+        rng = self._cell_range(*bounds)
+        self._bounds[body] = bounds
+        self._ranges[body] = rng
+        self._add_to_cells(body, rng)
+
+    def insert_many(self, bodies):
+        """
+        Insere todos os corpos da sequência no índice.
+        """
+        cells, ranges, all_bounds = self._cells, self._ranges, self._bounds
+        cell_range = self._cell_range
+        for body in bodies:
+            bounds = (body.left, body.bottom, body.right, body.top)
+            all_bounds[body] = bounds
+            ranges[body] = i0, j0, i1, j1 = cell_range(*bounds)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    cell = cells.get((i, j))
+                    if cell is None:
+                        cells[i, j] = cell = {}
+                    cell[body] = None
+
+    def remove(self, body):
+        """
+        Remove corpo do índice.
+        """
+        del self._bounds[body]
+        self._remove_from_cells(body, self._ranges.pop(body))
+
+    def update(self, body):
+        """
+        Atualiza a posição do corpo no índice.
+        """
+        bounds = (body.left, body.bottom, body.right, body.top)
+        self._bounds[body] = bounds
+        rng = self._cell_range(*bounds)
+        old = self._ranges[body]
+        if rng != old:
+            self._remove_from_cells(body, old)
+            self._add_to_cells(body, rng)
+            self._ranges[body] = rng
+
+    def clear(self):
+        """
+        Remove todos os corpos do índice.
+        """
+        self._cells.clear()
+        self._ranges.clear()
+        self._bounds.clear()
+
+    def _add_to_cells(self, body, rng):
+        cells = self._cells
+        i0, j0, i1, j1 = rng
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = cells.get((i, j))
+                if cell is None:
+                    cells[i, j] = cell = {}
+                cell[body] = None
+
+    def _remove_from_cells(self, body, rng):
+        cells = self._cells
+        i0, j0, i1, j1 = rng
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = cells[i, j]
+                del cell[body]
+                if not cell:
+                    del cells[i, j]
+
+    #
+    # Consultas
+    #
+    def query_point(self, x, y):
+        """
+        Retorna sequência de corpos cuja caixa de contorno contém o ponto.
+        """
+        cell = self._cells.get((floor(x * self._inv_x), floor(y * self._inv_y)))
+        if cell is None:
+            return ()
+        bounds = self._bounds
+        result = []
+        for body in cell:
+            left, bottom, right, top = bounds[body]
+            if left <= x <= right and bottom <= y <= top:
+                result.append(body)
+        return result
+
+    def query_points(self, points):
+        """
+        Versão em lote de query_point.
+
+        Retorna a tupla (n_points, groups), onde groups é um dicionário que
+        associa cada tipo de corpo às listas paralelas (point_ids, bodies, xs,
+        ys) com os candidatos encontrados para cada ponto.
+
+        Os pontos são agrupados por célula para que os limites de cada corpo
+        sejam lidos uma única vez por célula e testados contra todos os pontos
+        da célula em um único laço.
+        """
+        inv_x, inv_y = self._inv_x, self._inv_y
+        xs, ys, by_cell = [], [], {}
+        for n, (x, y) in enumerate(points):
+            xs.append(x)
+            ys.append(y)
+            key = (floor(x * inv_x), floor(y * inv_y))
+            ids = by_cell.get(key)
+            if ids is None:
+                by_cell[key] = [n]
+            else:
+                ids.append(n)
+
+        cells, bounds = self._cells, self._bounds
+        groups = {}
+        for key, ids in by_cell.items():
+            cell = cells.get(key)
+            if cell is None:
+                continue
+            for body in cell:
+                left, bottom, right, top = bounds[body]
+                hits = [
+                    n for n in ids if left <= xs[n] <= right and bottom <= ys[n] <= top
+                ]
+                if not hits:
+                    continue
+                group = groups.get(type(body))
+                if group is None:
+                    groups[type(body)] = group = ([], [], [], [])
+                point_ids, group_bodies, group_xs, group_ys = group
+                point_ids.extend(hits)
+                group_bodies.extend([body] * len(hits))
+                group_xs.extend([xs[n] for n in hits])
+                group_ys.extend([ys[n] for n in hits])
+        return len(xs), groups
+
+    def query_bb(self, left, bottom, right, top, out):
+        """
+        Adiciona à lista out os corpos cuja caixa de contorno intercepta o
+        retângulo dado.
+        """
+        i0, j0, i1, j1 = self._cell_range(left, bottom, right, top)
+        bounds = self._bounds
+        seen = set()
+        for cell in self._cells_in_range(i0, j0, i1, j1):
+            for body in cell:
+                if body in seen:
+                    continue
+                seen.add(body)
+                b_left, b_bottom, b_right, b_top = bounds[body]
+                if b_left <= right and left <= b_right:
+                    if b_bottom <= top and bottom <= b_top:
+                        out.append(body)
+        return out
+
+    def _cells_in_range(self, i0, j0, i1, j1):
+        """
+        Itera sobre as células ocupadas com índices no intervalo dado.
+        """
+        cells = self._cells
+        # Para regiões grandes é mais barato percorrer as células ocupadas.
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(cells):
+            for (i, j), cell in cells.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    yield cell
+        else:
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    cell = cells.get((i, j))
+                    if cell is not None:
+                        yield cell
+
+    def nearest(self, x, y, k, max_distance, out):
+        """
+        Adiciona à lista out os k corpos mais próximos do ponto (x, y), em
+        ordem crescente de distância até a caixa de contorno de cada corpo.
+
+        Utiliza busca best-first: as células são visitadas em anéis
+        concêntricos ao redor do ponto e os candidatos saem de uma fila de
+        prioridades assim que nenhum corpo ainda não visitado puder estar mais
+        próximo.
+        """
+        size_x, size_y = self._size_x, self._size_y
+        cells, bounds = self._cells, self._bounds
+        ci, cj = floor(x * self._inv_x), floor(y * self._inv_y)
+        max_distance = float("inf") if max_distance is None else max_distance
+        total = len(self._ranges)
+        heap, seen = [], set()
+        count = 0
+
+        def push(body):
+            nonlocal count
+            seen.add(body)
+            left, bottom, right, top = bounds[body]
+            dx = max(left - x, 0.0, x - right)
+            dy = max(bottom - y, 0.0, y - top)
+            dist = sqrt(dx * dx + dy * dy)
+            if dist <= max_distance:
+                heappush(heap, (dist, count, body))
+                count += 1
+
+        ring = 0
+        while len(out) < k:
+            # Anel muito grande: é mais barato percorrer as células ocupadas.
+            if (2 * ring + 1) ** 2 > 4 * len(cells) or len(seen) == total:
+                for cell in cells.values():
+                    for body in cell:
+                        if body not in seen:
+                            push(body)
+                bound = float("inf")
+            else:
+                for i in range(ci - ring, ci + ring + 1):
+                    for j in range(cj - ring, cj + ring + 1):
+                        if max(abs(i - ci), abs(j - cj)) != ring:
+                            continue
+                        for body in cells.get((i, j), ()):
+                            if body not in seen:
+                                push(body)
+
+                # Distância mínima até as células fora dos anéis já visitados.
+                bound = min(
+                    x - (ci - ring) * size_x,
+                    (ci + ring + 1) * size_x - x,
+                    y - (cj - ring) * size_y,
+                    (cj + ring + 1) * size_y - y,
+                )
+
+            while heap and heap[0][0] <= bound and len(out) < k:
+                out.append(heappop(heap)[2])
+            if bound == float("inf") or bound > max_distance:
+                break
+            ring += 1
+        return out
+
+    def traverse(self, ax, ay, bx, by, margin=0.0):
+        """
+        Percorre as células atravessadas pelo segmento de (ax, ay) até (bx, by)
+        na ordem em que são visitadas.
+
+        Produz tuplas (bodies, t_enter, t_exit) para cada célula ocupada, onde
+        t_enter e t_exit são as frações do segmento em que ele entra e sai da
+        célula. Se margin for positivo, inclui também as células vizinhas que
+        estão a uma distância menor que margin do segmento. Cada corpo aparece
+        no máximo uma vez.
+        """
+        size_x, size_y = self._size_x, self._size_y
+        cells = self._cells
+        i, j = floor(ax / size_x), floor(ay / size_y)
+        i_end, j_end = floor(bx / size_x), floor(by / size_y)
+        dx, dy = bx - ax, by - ay
+        inf = float("inf")
+
+        step_i = (dx > 0) - (dx < 0)
+        step_j = (dy > 0) - (dy < 0)
+        t_delta_i = size_x / abs(dx) if dx else inf
+        t_delta_j = size_y / abs(dy) if dy else inf
+        t_max_i = ((i + (dx > 0)) * size_x - ax) / dx if dx else inf
+        t_max_j = ((j + (dy > 0)) * size_y - ay) / dy if dy else inf
+
+        k = int(margin / min(size_x, size_y)) + 1 if margin > 0 else 0
+        seen = set()
+        t_enter = 0.0
+        while True:
+            t_exit = min(t_max_i, t_max_j, 1.0)
+            bodies = []
+            for ii in range(i - k, i + k + 1):
+                for jj in range(j - k, j + k + 1):
+                    cell = cells.get((ii, jj))
+                    if cell is None:
+                        continue
+                    for body in cell:
+                        if body not in seen:
+                            seen.add(body)
+                            bodies.append(body)
+            if bodies:
+                yield bodies, t_enter, t_exit
+
+            if (i == i_end and j == j_end) or t_exit >= 1.0:
+                break
+            t_enter = t_exit
+            if t_max_i < t_max_j:
+                i += step_i
+                t_max_i += t_delta_i
+            else:
+                j += step_j
+                t_max_j += t_delta_j
+
+    def cell_chunks(self, n):
+        """
+        Divide as células ocupadas em até n blocos que podem ser passados a
+        pairs() separadamente, por exemplo, em threads diferentes.
+        """
+        return split(list(self._cells.items()), n)
+
+    def pairs(self, cells=None):
+        """
+        Itera sobre os pares de corpos cujas caixas de contorno se sobrepõem.
+
+        Cada par é produzido uma única vez, na célula de menor índice comum
+        aos dois corpos. Se cells for dado (veja cell_chunks()), considera
+        apenas os pares produzidos nestas células.
+        """
+        ranges, bounds = self._ranges, self._bounds
+        if cells is None:
+            cells = self._cells.items()
+        for (i, j), cell in cells:
+            if len(cell) < 2:
+                continue
+            bodies = list(cell)
+            for n, a in enumerate(bodies):
+                ai, aj, _, _ = ranges[a]
+                a_left, a_bottom, a_right, a_top = bounds[a]
+                for b in bodies[n + 1 :]:
+                    bi, bj, _, _ = ranges[b]
+                    if (ai if ai > bi else bi) != i or (aj if aj > bj else bj) != j:
+                        continue
+                    b_left, b_bottom, b_right, b_top = bounds[b]
+                    if (
+                        a_left <= b_right
+                        and b_left <= a_right
+                        and a_bottom <= b_top
+                        and b_bottom <= a_top
+                    ):
+                        yield a, b
+
+    def pairs_with(self, other):
+        """
+        Itera sobre os pares (a, b), com a neste índice e b no índice other,
+        cujas caixas de contorno se sobrepõem.
+
+        Os dois índices devem utilizar o mesmo tamanho de célula. Cada par é
+        produzido uma única vez, na célula de menor índice comum aos dois
+        corpos.
+        """
+        other_cells = other._cells
+        if not other_cells:
+            return
+        other_ranges, other_bounds = other._ranges, other._bounds
+        bounds = self._bounds
+        for a, (i0, j0, i1, j1) in self._ranges.items():
+            a_left, a_bottom, a_right, a_top = bounds[a]
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    cell = other_cells.get((i, j))
+                    if cell is None:
+                        continue
+                    for b in cell:
+                        bi, bj, _, _ = other_ranges[b]
+                        if (i0 if i0 > bi else bi) != i or (j0 if j0 > bj else bj) != j:
+                            continue
+                        b_left, b_bottom, b_right, b_top = other_bounds[b]
+                        if (
+                            a_left <= b_right
+                            and b_left <= a_right
+                            and a_bottom <= b_top
+                            and b_bottom <= a_top
+                        ):
+                            yield a, b
+
+
+class PeriodicSpatialHash(SpatialHash):
+    """
+    Índice espacial para mundos periódicos, onde o retângulo dado por period
+    = (left, bottom, width, height) se repete indefinidamente.
+
+    As células são ajustadas para dividir o período exatamente e os índices
+    das células são tomados em módulo, de forma que corpos próximos através
+    das bordas compartilham células. Os pares são testados pela convenção da
+    imagem mínima.
+
+    As consultas e os pares entre índices distintos (pairs_with) consideram
+    apenas a imagem principal de cada corpo.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE, period=(0.0, 0.0, 1.0, 1.0)):
+        super().__init__(cell_size)
+        left, bottom, width, height = map(float, period)
+        self.period = (left, bottom, width, height)
+        nx = max(1, round(width / self.cell_size))
+        ny = max(1, round(height / self.cell_size))
+        self._size_x, self._size_y = width / nx, height / ny
+        self._inv_x, self._inv_y = nx / width, ny / height
+        self._cells = _WrappedCells(nx, ny)
+
+    def _cell_range(self, left, bottom, right, top):
+        i0, j0, i1, j1 = super()._cell_range(left, bottom, right, top)
+        # Corpos maiores que o período ocupam todas as colunas/linhas.
+        cells = self._cells
+        return i0, j0, min(i1, i0 + cells.nx - 1), min(j1, j0 + cells.ny - 1)
+
+    def _cells_in_range(self, i0, j0, i1, j1):
+        # As chaves das células são guardadas em módulo (nx, ny) e não podem
+        # ser comparadas com o intervalo. O intervalo nunca excede o período.
+        cells = self._cells
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = cells.get((i, j))
+                if cell is not None:
+                    yield cell
+
+    def minimum_image(self, a, b, other=None):
+        """
+        Retorna o deslocamento (dx, dy) que deve ser aplicado ao corpo b
+        para que ele fique na imagem mais próxima do corpo a.
+
+        Se other for dado, o corpo b pertence ao índice other (por exemplo, o
+        índice de corpos estáticos).
+        """
+        _, _, width, height = self.period
+        a_left, a_bottom, a_right, a_top = self._bounds[a]
+        b_bounds = self._bounds if other is None else other._bounds
+        b_left, b_bottom, b_right, b_top = b_bounds[b]
+        dx = (a_left + a_right - b_left - b_right) / 2
+        dy = (a_bottom + a_top - b_bottom - b_top) / 2
+        return width * round(dx / width), height * round(dy / height)
+
+    def pairs(self):
+        """
+        Itera sobre os pares de corpos cujas caixas de contorno se sobrepõem
+        na convenção da imagem mínima.
+        """
+        bounds, minimum_image = self._bounds, self.minimum_image
+        seen = set()
+        for cell in self._cells.values():
+            if len(cell) < 2:
+                continue
+            bodies = list(cell)
+            for n, a in enumerate(bodies):
+                a_left, a_bottom, a_right, a_top = bounds[a]
+                for b in bodies[n + 1 :]:
+                    key = (a, b) if id(a) < id(b) else (b, a)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    sx, sy = minimum_image(a, b)
+                    b_left, b_bottom, b_right, b_top = bounds[b]
+                    if (
+                        a_left <= b_right + sx
+                        and b_left + sx <= a_right
+                        and a_bottom <= b_top + sy
+                        and b_bottom + sy <= a_top
+                    ):
+                        yield a, b
+
+
+class _WrappedCells(dict):
+    """
+    Dicionário de células que toma os índices (i, j) em módulo (nx, ny).
+    """
+
+    def __init__(self, nx, ny):
+        super().__init__()
+        self.nx, self.ny = nx, ny
+
+    def _wrap(self, key):
+        i, j = key
+        return i % self.nx, j % self.ny
+
+    def __getitem__(self, key):
+        return super().__getitem__(self._wrap(key))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(self._wrap(key), value)
+
+    def __delitem__(self, key):
+        super().__delitem__(self._wrap(key))
+
+    def __contains__(self, key):
+        return super().__contains__(self._wrap(key))
+
+    def get(self, key, default=None):
+        return super().get(self._wrap(key), default)
@@ -0,0 +1,66 @@
+"""
+Módulo de testes para o carregamento preguiçoso do Pyxel.
+"""
+import subprocess
+import sys
+import pytest
+import pytaon
+from pytaon import backend
+
+HEADLESS = """
+import sys
+import pytaon
+space = pytaon.Space(margin_bottom=0)
+space.add_circle(1, (0, 0), vel=(0, -1))
+space.add_aabb(0, 0, 2, 2)
+space.step(0.1)
+assert not hasattr(pytaon, "__all__")
+from pytaon import *
+assert "pyxel" not in sys.modules
+"""
+
+
+def test_simulation_does_not_import_pyxel():
+    subprocess.run([sys.executable, "-c", HEADLESS], check=True)
+
+
+def test_backend_is_loaded_on_first_use():
+    assert backend.circ is backend.load().circ
+    assert backend.COLOR_RED == backend.load().COLOR_RED
+
+
+class TestModuleAttributes:
+    @pytest.fixture
+    def screen(self, monkeypatch):
+        pyxel = backend.load()
+        for name, value in [("width", 100), ("height", 60), ("frame_count", 0)]:
+            monkeypatch.setattr(pyxel, name, value, raising=False)
+        monkeypatch.setattr(pyxel, "mouse_x", 10, raising=False)
+        monkeypatch.setattr(pyxel, "mouse_y", 20, raising=False)
+        return pyxel
+
+    def test_pyxel_constants_are_cached(self):
+        assert pytaon.COLOR_YELLOW == backend.load().COLOR_YELLOW
+        assert "COLOR_YELLOW" in vars(pytaon)
+        assert pytaon.line is backend.load().line
+
+    def test_middle_follows_screen_size(self, screen):
+        middle = pytaon.middle
+        assert middle == (50, 30)
+        screen.width = 200
+        assert pytaon.middle == (100, 30)
+
+    def test_vectors_are_not_shared(self, screen):
+        middle, mouse_pos = pytaon.middle, pytaon.mouse_pos
+        middle += (1, 0)
+        mouse_pos += (1, 0)
+        assert pytaon.middle == (50, 30)
+        assert pytaon.mouse_pos == (5, 10)
+        assert pytaon.middle is not pytaon.middle
+
+    def test_mouse_pos_updates_once_per_frame(self, screen):
+        assert pytaon.mouse_pos == (5, 10)
+        screen.mouse_x = 30
+        assert pytaon.mouse_pos == (5, 10)
+        screen.frame_count += 1
+        assert pytaon.mouse_pos == (15, 10)
@@ -0,0 +1,47 @@
+"""
+Módulo de testes para a simulação paralela de espaços.
+"""
+import pytest
+from pytaon import Space, SpaceBatch
+
+
+def make_space(i):
+    space = Space(gravity=(0, -i), margin_bottom=0)
+    space.add_circle(1, (0, 10), vel=(i, 0))
+    space.add_aabb(5, 5, 7, 7, vel=(0, -5))
+    return space
+
+
+def time_and_count(space):
+    return space.time, len(space.bodies)
+
+
+@pytest.fixture
+def batch():
+    with SpaceBatch(make_space, 5, workers=2) as batch:
+        yield batch
+
+
+class TestSpaceBatch:
+    def test_matches_serial_simulation(self, batch):
+        batch.step_all(0.1, 20)
+        for i in range(len(batch)):
+            space = make_space(i)
+            for _ in range(20):
+                space.step(0.1)
+            expected = []
+            for body in space.bodies:
+                expected += [body.position_x, body.position_y]
+                expected += [body.velocity_x, body.velocity_y]
+            assert batch.state(i).tolist() == expected
+
+    def test_gather(self, batch):
+        batch.step_all(0.5, 2)
+        assert batch.gather(time_and_count) == [(1.0, 2)] * 5
+
+    def test_set_state(self, batch):
+        state = batch.state(3)
+        state[0], state[2] = 100.0, 1.0
+        batch.set_state(3, state)
+        batch.step_all(1.0)
+        assert batch.state(3)[0] == 101.0
@@ -0,0 +1,60 @@
+"""
+Módulo de testes para a simulação de ensembles.
+"""
+import pytest
+from pytaon import Space, Body
+
+
+def make_space():
+    space = Space(gravity=(0, -10), margin_bottom=0, margin_left=0, restitution=0.5)
+    space.add_circle(1, (5, 3), vel=(-4, 0))
+    space.add_circle(2, (10, 8), vel=(1, 1), mass=3)
+    space.add_aabb(20, 0, 22, 2, body_type=Body.STATIC)
+    return space
+
+
+class TestEnsemble:
+    def test_copies_match_space(self):
+        space = make_space()
+        ensemble = space.ensemble(3)
+        for _ in range(50):
+            ensemble.step(0.05)
+        for _ in range(50):
+            space.step(0.05)
+
+        for k in range(3):
+            assert ensemble.positions(k) == [
+                (body.position_x, body.position_y) for body in space.bodies
+            ]
+            assert ensemble.velocities(k) == [
+                tuple(body.velocity) for body in space.bodies
+            ]
+
+    def test_different_initial_conditions(self):
+        ensemble = make_space().ensemble(2)
+        ensemble.vx[ensemble.index(1, 0)] = 0.0
+        ensemble.step(0.1)
+        assert ensemble.positions(0)[0] != ensemble.positions(1)[0]
+        assert ensemble.positions(1)[2] == (21, 1)
+
+    def test_forces_and_energy(self):
+        space = Space()
+        space.add_circle(1, (0, 0), mass=2)
+        ensemble = space.ensemble(2)
+
+        def push(ens, time):
+            ens.apply_forces([2.0, 4.0], [0.0, 0.0])
+
+        ensemble.force_func = push
+        ensemble.step(1)
+        assert ensemble.velocities(1) == [(2, 0)]
+        assert ensemble.kinetic_energy() == [1, 4]
+        ensemble.apply_to_space(1)
+        assert space.bodies[0].position == (2, 0)
+
+    def test_rejects_body_functions(self):
+        for hook in ["force_func", "velocity_func", "position_func"]:
+            space = make_space()
+            setattr(space.bodies[1], hook, lambda body, *args: (1, 0))
+            with pytest.raises(ValueError):
+                space.ensemble(2)
@@ -0,0 +1,91 @@
+"""
+Módulo de testes para a detecção de colisões genérica via GJK/EPA.
+"""
+import random
+import pytest
+from pytaon import Poly, AABB, Body, Circle, Segment, Space
+from pytaon.gjk import get_collision_gjk
+
+
+def similar(x, y, tol=1e-6):
+    return abs(x - y) <= tol
+
+
+@pytest.fixture
+def square():
+    return Poly([(0, 0), (2, 0), (2, 2), (0, 2)])
+
+
+class TestGJK:
+    def test_support(self, square):
+        assert square.support((1, 1)) == (2, 2)
+        assert AABB(0, 0, 1, 2).support((-1, 1)) == (0, 2)
+        assert Circle(2, (1, 1)).support((0, -3)) == (1, -1)
+        assert Segment((0, 0), (4, 0), 1).support((1, 0)) == (5, 0)
+
+    def test_agrees_with_sat(self, square):
+        rng = random.Random(42)
+        triangle = Poly([(0, 0), (1.5, 0.3), (1, 1.2)])
+        for _ in range(200):
+            triangle.position_x = rng.uniform(-2, 3)
+            triangle.position_y = rng.uniform(-2, 3)
+            sat = square.get_collision_poly(triangle)
+            gjk = get_collision_gjk(square, triangle)
+            assert (sat is None) == (gjk is None)
+            if sat is not None:
+                assert similar(sat.depth, gjk.depth, 1e-5)
+                assert similar(sat.normal_x, gjk.normal_x, 1e-5)
+                assert similar(sat.normal_y, gjk.normal_y, 1e-5)
+
+    def test_circle_aabb(self):
+        col = Circle(1, (0, 0)).get_collision(AABB(0.5, -1, 3, 1))
+        assert similar(col.depth, 0.5)
+        assert similar(abs(col.normal_x), 1)
+        assert Circle(1, (0, 0)).get_collision(AABB(1.5, -1, 3, 1)) is None
+
+    def test_segment(self):
+        segment = Segment((0, 0), (4, 0), 0.5)
+        col = segment.get_collision(Circle(1, (2, 1.2)))
+        assert similar(col.depth, 0.3)
+        assert segment.get_collision(Circle(1, (2, 1.6))) is None
+
+    def test_contact_inside_both_bodies(self, square):
+        vertical = Segment((0, -5), (0, 5), 0.5)
+        horizontal = Segment((-5, 0), (5, 0), 0.5)
+        other = Poly([(1.5, 0.5), (3.5, 0.5), (3.5, 1.5), (1.5, 1.5)])
+        for a, b in [(vertical, horizontal), (horizontal, vertical), (square, other)]:
+            col = get_collision_gjk(a, b)
+            x, y = col.position_x, col.position_y
+            assert a.contains_point(x, y) and b.contains_point(x, y)
+
+    def test_axis_aligned_normal(self):
+        col = get_collision_gjk(Circle(1, (0, 0.9)), AABB(-10, -1, 10, 0))
+        assert (col.normal_x, col.normal_y) == (0, -1)
+
+        space = Space(gravity=(0, -10))
+        ball = space.add_circle(1, (0, 5), color=3)
+        space.add_aabb(-10, -1, 10, 0, body_type=Body.STATIC)
+        for _ in range(100):
+            space.step(0.02)
+            if ball.velocity.y > 0:
+                break
+        assert ball.velocity.y > 0 and ball.color == 3
+
+    def test_axis_cache_per_space(self):
+        # Caixas de contorno se interceptam, mas os corpos estão separados.
+        a = Segment((0, 0), (4, 4), 0.5)
+        b = Segment((3, 0), (7, 4), 0.5)
+        space, other = Space(), Space()
+        space.add_many([a, b])
+        other.add(Circle(1, (0, 0)))
+
+        space.step(0.1)
+        assert len(space._axis_cache) == 1
+        assert len(other._axis_cache) == 0
+
+        # Pares que deixam de ser testados são descartados no passo seguinte.
+        space.remove(b)
+        space.step(0.1)
+        space.step(0.1)
+        assert len(space._axis_cache) == 0
+        assert space._axis_cache.get(a, b) is None
@@ -0,0 +1,37 @@
+"""
+Módulo de testes para o sistema de partículas.
+"""
+import pytest
+from pytaon import Space, ParticleSystem
+
+
+class TestParticleSystem:
+    def test_step_integrates_positions(self):
+        particles = ParticleSystem(capacity=2, gravity=(0, -10))
+        idx = particles.emit((0, 0), (1, 2))
+        particles.step(0.5)
+        assert particles.vx[idx] == 1 and particles.vy[idx] == -3
+        assert particles.x[idx] == 0.5 and particles.y[idx] == -1.5
+
+    def test_expired_particles_are_recycled(self):
+        particles = ParticleSystem(capacity=2)
+        a = particles.emit((0, 0), lifetime=0.5)
+        b = particles.emit((0, 0), lifetime=2.0)
+        c = particles.emit((0, 0))
+        assert (a, b, c) == (0, 1, 2)
+        assert len(particles) == 3
+
+        particles.step(1.0)
+        assert particles.alive() == bytes([0, 1, 0])
+        assert len(particles) == 1
+        assert particles.emit((5, 5)) == 0
+        assert particles.x[0] == 5
+
+    def test_attached_to_space(self):
+        space = Space(gravity=(0, 2), damping=-0.5)
+        particles = space.add_particle_system(capacity=1)
+        particles.emit((0, 0), (4, 0))
+        space.step(1)
+        assert particles.vx[0] == pytest.approx(2)
+        assert particles.vy[0] == pytest.approx(2)
+        assert particles.x[0] == pytest.approx(2)
@@ -0,0 +1,65 @@
+"""
+Módulo de testes para a simulação de espaços particionados.
+"""
+import random
+import pytest
+from pytaon import Space, Body, PartitionedSpace
+
+
+def make_world():
+    space = Space(gravity=(0, -5), margin_left=0, margin_right=90, margin_bottom=0)
+    space.add_aabb(-10, -5, 100, 0, body_type=Body.STATIC)
+    rng = random.Random(3)
+    for _ in range(60):
+        x, y = rng.uniform(2, 88), rng.uniform(2, 40)
+        vel = (rng.uniform(-20, 20), rng.uniform(-10, 10))
+        if rng.random() < 0.5:
+            space.add_circle(rng.uniform(0.5, 1.5), (x, y), vel=vel)
+        else:
+            space.add_aabb(x - 1, y - 1, x + 1, y + 0.5, vel=vel)
+    return space
+
+
+def make_crowded():
+    space = Space()
+    for i in range(4):
+        space.add_circle(5, (i, 0))
+    return space
+
+
+def state(space):
+    return [(body.position_x, body.position_y) for body in space.bodies]
+
+
+class TestPartitionedSpace:
+    def test_matches_single_process(self):
+        space = make_world()
+        with PartitionedSpace(make_world, workers=3) as partitioned:
+            assert len(partitioned) == len(space.bodies)
+            assert partitioned.positions() == state(space)
+            owners = {partitioned.owner(i) for i in range(1, len(space.bodies))}
+            assert owners == {0, 1, 2}
+
+            for _ in range(4):
+                partitioned.step(0.05, 10)
+                for _ in range(10):
+                    space.step(0.05)
+                for got, expected in zip(partitioned.positions(), state(space)):
+                    assert got == pytest.approx(expected)
+            assert partitioned.time == pytest.approx(space.time)
+
+    def test_set_state(self):
+        space = make_world()
+        body = space.bodies[5]
+        body.position_y, body.velocity_x, body.velocity_y = 30, 0, 0
+        space.step(0.1)
+        with PartitionedSpace(make_world, workers=2) as partitioned:
+            x, y, _, _ = partitioned.state(5)
+            partitioned.set_state(5, (x, 30, 0, 0))
+            partitioned.step(0.1)
+            expected = [body.position_x, body.position_y, *body.velocity]
+            assert partitioned.state(5).tolist() == pytest.approx(expected)
+
+    def test_regions_narrower_than_ghosts(self):
+        with pytest.raises(ValueError):
+            PartitionedSpace(make_crowded, workers=3)
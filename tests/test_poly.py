@@ -0,0 +1,80 @@
+"""
+Módulo de testes para a classe Poly e colisões pelo teorema do eixo separador.
+"""
+import pytest
+from pytaon import Poly, AABB, Circle
+
+
+def similar(x, y, tol=1e-6):
+    return abs(x - y) <= tol
+
+
+@pytest.fixture
+def square():
+    return Poly([(0, 0), (2, 0), (2, 2), (0, 2)])
+
+
+class TestPoly:
+    def test_geometry(self, square):
+        assert square.position == (1, 1)
+        assert similar(square.area, 4)
+        assert similar(square.moment, 2 / 3)
+        assert (square.left, square.bottom, square.right, square.top) == (0, 0, 2, 2)
+
+    def test_clockwise_vertices_are_reoriented(self):
+        poly = Poly([(0, 0), (0, 2), (2, 2), (2, 0)])
+        assert similar(poly.area, 4)
+
+    def test_vertices_follow_position(self, square):
+        vertices = square.get_vertices()
+        assert square.get_vertices() is vertices
+        square.position_x += 1
+        assert square.get_vertices()[0] == (1, 0)
+        assert square.left == 1
+
+    def test_collision_poly(self, square):
+        other = Poly([(1.5, 0.5), (3.5, 0.5), (3.5, 2.5), (1.5, 2.5)])
+        col = square.get_collision_poly(other)
+        assert (col.normal_x, col.normal_y) == (1, 0)
+        assert similar(col.depth, 0.5)
+
+        other.position_x += 1
+        assert square.get_collision(other) is None
+
+    def test_contact_in_intersection(self):
+        a = Poly([(0, 0), (4, 0), (4, 4), (0, 4)])
+        b = Poly([(3, 1), (7, 1), (7, 3), (3, 3)])
+        for col in [a.get_collision(b), b.get_collision(a)]:
+            assert 3 <= col.position_x <= 4 and 1 <= col.position_y <= 3
+            assert (col.position_x, col.position_y) == (3.5, 2)
+
+        col = a.get_collision(AABB(3, 1, 7, 3))
+        assert (col.position_x, col.position_y) == (3.5, 2)
+
+    def test_collision_aabb(self, square):
+        col = square.get_collision(AABB(1, 1.8, 2, 4))
+        assert (col.normal_x, col.normal_y) == (0, 1)
+        assert similar(col.depth, 0.2)
+        assert square.get_collision(AABB(3, 3, 4, 4)) is None
+
+    def test_collision_circle(self, square):
+        col = square.get_collision_circle(Circle(1, (2.5, 1)))
+        assert (col.normal_x, col.normal_y) == (1, 0)
+        assert similar(col.depth, 0.5)
+
+        col = square.get_collision_circle(Circle(1, (2.5, 2.5)))
+        assert similar(col.normal_x, col.normal_y)
+        assert square.get_collision(Circle(0.5, (2.5, 2.5))) is None
+
+    def test_segment_query_rounded_corners(self, square):
+        # Arestas deslocadas sem arredondamento estendem os cantos agudos.
+        thin = Poly([(0, 0), (10, 0), (10, 0.5)])
+        assert thin.segment_query((-20, 3), (-20, -3), radius=1) is None
+        assert thin.segment_query((-0.5, 3), (-0.5, -3), radius=1) is not None
+
+        x = -((1 - 0.9 ** 2) ** 0.5)
+        for body in [square, AABB(0, 0, 2, 2)]:
+            info = body.segment_query((-2, 2.9), (4, 2.9), radius=1)
+            assert similar(info.point.x, x) and similar(info.normal.y, 0.9)
+            info = body.segment_query((-2, 1), (4, 1), radius=1)
+            assert tuple(info.point) == (-1, 1) and tuple(info.normal) == (-1, 0)
@@ -0,0 +1,48 @@
+"""
+Módulo de testes para a gravação de trajetórias.
+"""
+import pytest
+from pytaon import Space, TrajectoryRecorder, Trajectory
+
+
+@pytest.fixture
+def space():
+    space = Space(gravity=(0, -10))
+    space.add_circle(1, (0, 0), vel=(1, 0))
+    space.add_circle(1, (10, 0), vel=(0, 2))
+    return space
+
+
+class TestTrajectoryRecorder:
+    def test_record_and_read(self, space, tmp_path):
+        path = tmp_path / "traj.bin"
+        a, b = space.bodies
+        with TrajectoryRecorder(space, path, bodies=[b], stride=2, capacity=2):
+            for _ in range(9):
+                space.step(0.1)
+                if space.time == pytest.approx(0.6):
+                    expected = (tuple(b.position), tuple(b.velocity))
+
+        with Trajectory(path) as trajectory:
+            assert len(trajectory) == 4
+            assert trajectory.n_bodies == 1
+            assert trajectory.data.shape == (4, 5)
+            assert trajectory.time(2) == pytest.approx(0.6)
+            assert (trajectory.position(2, 0), trajectory.velocity(2, 0)) == expected
+        assert path.stat().st_size == 32 + 4 * 5 * 8
+
+    def test_recording_stops_on_close(self, space, tmp_path):
+        path = tmp_path / "traj.bin"
+        recorder = TrajectoryRecorder(space, path)
+        space.step(0.1)
+        recorder.close()
+        space.step(0.1)
+        with Trajectory(path) as trajectory:
+            assert len(trajectory) == 1
+            assert trajectory.data.shape == (1, 9)
+
+    def test_empty(self, space, tmp_path):
+        path = tmp_path / "traj.bin"
+        TrajectoryRecorder(space, path).close()
+        with Trajectory(path) as trajectory:
+            assert len(trajectory) == 0
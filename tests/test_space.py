@@ -0,0 +1,701 @@
+"""
+Módulo de testes para a classe Space.
+"""
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import pytest
+from pytaon import Space, Body, Circle, AABB
+from pytaon import backend as pyxel
+
+
+@pytest.fixture
+def space():
+    return Space()
+
+
+class TestCollisionFiltering:
+    def test_group_filters_pairs(self, space):
+        a = space.add_circle(1, (0, 0), group=1)
+        b = space.add_circle(1, (1, 0), group=1)
+        c = space.add_circle(1, (1, 1), group=2)
+        pairs = [set(col.bodies) for col in space.get_collisions()]
+        assert {a, b} not in pairs
+        assert {a, c} in pairs and {b, c} in pairs
+
+    def test_category_and_mask(self, space):
+        space.add_circle(1, (0, 0), category=0b01, mask=0b10)
+        space.add_circle(1, (1, 0), category=0b01, mask=0b10)
+        assert list(space.get_collisions()) == []
+
+        space.add_circle(1, (0, 1), category=0b10, mask=0b01)
+        assert len(list(space.get_collisions())) == 2
+
+    def test_filtered_pairs_do_not_reach_narrowphase(self, space):
+        class Wall(AABB):
+            def get_collision(self, other):
+                raise AssertionError("narrowphase executada")
+
+        space.add(Wall(0, 0, 1, 1, group=1))
+        space.add(Wall(0, 0, 1, 1, group=1))
+        space.step(0.1)
+
+
+class TestBodyTypes:
+    def test_static_bodies_are_not_integrated(self):
+        space = Space(gravity=(0, -10))
+        wall = space.add_aabb(0, 0, 10, 1, vel=(1, 1), body_type=Body.STATIC)
+        space.step(0.1)
+        assert (wall.left, wall.bottom) == (0, 0)
+        assert wall.velocity == (1, 1)
+
+    def test_kinematic_bodies_ignore_forces(self):
+        space = Space(gravity=(0, -10))
+        paddle = space.add_aabb(0, 0, 2, 2, vel=(10, 0), body_type=Body.KINEMATIC)
+        space.step(0.1)
+        assert paddle.velocity == (10, 0)
+        assert paddle.left == 1
+
+    def test_static_and_kinematic_pairs_are_never_generated(self, space):
+        class Wall(AABB):
+            def get_collision(self, other):
+                raise AssertionError("narrowphase executada")
+
+        space.add(Wall(0, 0, 1, 1, body_type=Body.STATIC))
+        space.add(Wall(0, 0, 1, 1, body_type=Body.STATIC))
+        space.add(Wall(0, 0, 1, 1, body_type=Body.KINEMATIC))
+        space.add(Wall(0, 0, 1, 1, body_type=Body.KINEMATIC))
+        space.step(0.1)
+
+    def test_dynamic_body_collides_with_static_body(self, space):
+        wall = space.add_aabb(0, -1, 10, 0, body_type=Body.STATIC)
+        ball = space.add_aabb(4, -0.5, 6, 1.5, vel=(0, -1))
+        (col,) = space.get_collisions()
+        assert set(col.bodies) == {wall, ball}
+        col.resolve()
+        assert ball.velocity == (0, 1)
+        assert wall.velocity == (0, 0)
+
+    def test_queries_include_static_bodies(self, space):
+        wall = space.add_aabb(0, 0, 10, 1, body_type=Body.STATIC)
+        ball = space.add_circle(1, (5, 5))
+        assert space.point_query((5, 0.5)) == [wall]
+        assert set(space.bb_query(0, 0, 10, 10)) == {wall, ball}
+        assert space.nearest((5, 8), k=2) == [ball, wall]
+        assert space.ray_cast_first((5, 10), (5, -10)).body is ball
+        assert [info.body for info in space.segment_query((5, 10), (5, -10))] == [
+            ball,
+            wall,
+        ]
+
+    def test_invalid_body_type(self):
+        with pytest.raises(ValueError):
+            Circle(1, body_type="fixed")
+
+
+class TestAddRemove:
+    def test_remove(self, space):
+        a, b, c = [space.add_circle(1, (10 * i, 0)) for i in range(3)]
+        wall = space.add_aabb(0, -5, 30, -4, body_type=Body.STATIC)
+        space.remove(a)
+        space.remove(wall)
+        assert a not in space and wall not in space and b in space
+        assert set(space.bodies) == {b, c}
+        assert space.point_query((0, 0)) == []
+        assert space.point_query((0, -4.5)) == []
+        assert space.point_query((10, 0)) == [b]
+        with pytest.raises(ValueError):
+            space.remove(a)
+
+    def test_add_many_and_remove_many(self, space):
+        bodies = [Circle(1, (i, 0)) for i in range(100)]
+        space.add_many(bodies)
+        space.remove_many(bodies[::2])
+        assert set(space.bodies) == set(bodies[1::2])
+        assert all(body in space for body in bodies[1::2])
+        offsets, indices = space.point_query_many([(99, 0)])
+        assert [space.bodies[i] for i in indices] == [bodies[99]]
+
+    def test_removal_from_handler_is_deferred(self, space):
+        def pre_solve(col):
+            space.remove_many(col.bodies)
+            assert col.body_a in space
+            return True
+
+        space.add_default_collision_handler(pre_solve=pre_solve)
+        space.add_circle(1, (0, 0))
+        space.add_circle(1, (1, 0))
+        space.step(0.1)
+        assert space.bodies == []
+        assert space.get_collisions() == []
+
+
+class TestBulkConstruction:
+    def test_add_circles(self, space):
+        pos = [(0, 0), (10, 0), (20, 0)]
+        circles = space.add_circles([1, 2, 3], pos, vel=[(1, 0)] * 3, color=7)
+        assert space.bodies == circles
+        assert [c.radius for c in circles] == [1, 2, 3]
+        assert [c.color for c in circles] == [7, 7, 7]
+        assert circles[1].position == (10, 0) and circles[1].mass == 1.0
+
+        circles[0].velocity.x = 5
+        assert circles[1].velocity == (1, 0)
+        space.step(1)
+        assert [c.position.x for c in circles] == [5, 11, 21]
+        assert space.point_query((22, 0)) == [circles[2]]
+
+    def test_add_aabbs(self, space):
+        boxes = space.add_aabbs(
+            [0, 10], [0, 0], [2, 14], [2, 2], mass=[1, 2], body_type=Body.STATIC
+        )
+        assert [(b.position_x, b.mass) for b in boxes] == [(1, 1.0), (12, 2.0)]
+        assert all(b.body_type == Body.STATIC for b in boxes)
+        assert space.point_query((13, 1)) == [boxes[1]]
+        with pytest.raises(ValueError):
+            space.add_aabbs([0], [0], [-1], [1])
+
+    def test_replicate_matches_constructor(self):
+        circle = Circle(2, (0, 0), vel=(1, 1), damping=0.5, group=3)
+        (copy,) = circle.replicate(position=[(4, 5)])
+        expected = Circle(2, (4, 5), vel=(1, 1), damping=0.5, group=3)
+        assert copy.position == expected.position
+        assert copy.velocity is not circle.velocity
+        assert copy.force is not circle.force
+        assert (copy.damping, copy.group) == (0.5, 3)
+        copy.update_position(1)
+        assert copy.position == (5, 6) and circle.position == (0, 0)
+
+    def test_replicas_do_not_share_vectors(self, space):
+        pos = [(0, 0), (10, 0), (20, 0)]
+        circles = space.add_circles(1, pos, gravity=(0, -1))
+        circles[0].gravity += (0, 10)
+        assert circles[0].gravity == (0, 9)
+        assert [c.gravity for c in circles[1:]] == [(0, -1), (0, -1)]
+
+    def test_columns_must_match(self, space):
+        pos = [(0, 0), (10, 0), (20, 0), (30, 0), (40, 0)]
+        with pytest.raises(ValueError):
+            space.add_circles([1, 2, 3], pos)
+        with pytest.raises(ValueError):
+            space.add_circles(1, pos, vel=[(1, 0)] * 4)
+        with pytest.raises(ValueError):
+            space.add_aabbs([0, 10], [0, 0], [2, 14], [2])
+        with pytest.raises(ValueError):
+            Circle(1, (0, 0)).replicate(position=pos, color=[1, 2])
+        assert space.bodies == []
+
+
+class TestSnapshot:
+    def make_space(self):
+        space = Space(gravity=(0, -3), margin_left=0, margin_bottom=0)
+        rng = random.Random(5)
+        for _ in range(20):
+            x, y = rng.uniform(0, 50), rng.uniform(0, 50)
+            vel = (rng.uniform(-9, 9), rng.uniform(-9, 9))
+            space.add_circle(rng.uniform(0.3, 2), (x, y), vel=vel, damping=-0.1)
+            space.add_aabb(x + 0.1, y, x + 1.3, y + 0.7, vel=vel, gravity=(0, 1))
+        return space
+
+    def test_round_trip_is_bit_exact(self):
+        space = self.make_space()
+        space.step(0.1)
+        buf = space.snapshot()
+        for _ in range(10):
+            space.step(0.1)
+        assert space.snapshot() != buf
+        space.restore(buf)
+        assert space.snapshot() == buf
+
+    def test_resumed_simulation_matches(self):
+        space = self.make_space()
+        buf = space.snapshot()
+        for _ in range(10):
+            space.step(0.05)
+        expected = space.snapshot()
+
+        space.restore(buf)
+        for _ in range(10):
+            space.step(0.05)
+        assert space.snapshot() == expected
+
+    def test_restore_checks_bodies(self, space):
+        space.add_circle(1)
+        buf = space.snapshot()
+        space.add_circle(1)
+        with pytest.raises(ValueError):
+            space.restore(buf)
+        with pytest.raises(ValueError):
+            space.restore(b"XXXX" + buf[4:])
+
+
+class TestIterSteps:
+    def test_frames(self, space):
+        a = space.add_circle(1, (0, 0), vel=(1, 0))
+        b = space.add_aabb(10, 10, 12, 12, vel=(0, -2))
+        frames = space.iter_steps(0.5, n=6, stride=2, fields=["position"])
+        result = [(f.step, f.time, list(f.pairs("position"))) for f in frames]
+        assert result == [
+            (2, 1.0, [(1, 0), (11, 9)]),
+            (4, 2.0, [(2, 0), (11, 7)]),
+            (6, 3.0, [(3, 0), (11, 5)]),
+        ]
+        assert (a.position.x, b.position_y) == (3, 5)
+
+    def test_lazy_and_unbounded(self, space):
+        space.add_circle(1, (0, 0), vel=(1, 0))
+        frames = space.iter_steps(0.5, fields=("velocity", "force"))
+        assert space.time == 0
+        frame = next(islice(frames, 3, None))
+        assert (frame.step, space.time) == (4, 2.0)
+        assert frame.position is None
+        assert memoryview(frame.velocity).tolist() == [1, 0]
+
+    def test_invalid_field(self, space):
+        with pytest.raises(ValueError):
+            space.iter_steps(0.1, fields=["mass"])
+
+    def test_invalid_arguments(self, space):
+        for kwargs in [{"stride": 0}, {"stride": -1}, {"n": -1}]:
+            with pytest.raises(ValueError):
+                space.iter_steps(0.1, **kwargs)
+        assert list(space.iter_steps(0.1, n=0)) == []
+        assert space.time == 0
+
+
+class TestThreads:
+    def make_space(self, executor):
+        space = Space(margin_left=0, margin_right=60, executor=executor)
+        space.add_aabb(-5, -5, 65, 0, body_type=Body.STATIC)
+        rng = random.Random(2)
+        for i in range(40):
+            x, y = rng.uniform(0, 60), rng.uniform(0, 60)
+            vel = (rng.uniform(-5, 5), rng.uniform(-5, 5))
+            space.add_circle(rng.uniform(1, 3), (x, y), vel=vel)
+            space.add_aabb(x, y, x + 2, y + 1, vel=vel, force_func=lambda b, t: (0, -t))
+        return space
+
+    def test_matches_serial(self, monkeypatch):
+        monkeypatch.setattr("pytaon.space.PARALLEL_MIN_BODIES", 0)
+        serial, threaded = self.make_space(None), self.make_space(3)
+
+        def pairs(space):
+            index = {body: i for i, body in enumerate(space.bodies)}
+            return [(index[c.body_a], index[c.body_b]) for c in space.get_collisions()]
+
+        assert len(pairs(threaded)) > 10
+        assert len(threaded._pools) > 1
+        assert pairs(threaded) == pairs(serial)
+        for _ in range(5):
+            serial.step(0.1)
+            threaded.step(0.1)
+        assert threaded.snapshot() == serial.snapshot()
+
+    def test_executor_lifecycle(self):
+        with Space(executor=2) as space:
+            executor = space.executor
+            assert space._threads == 2
+        assert space.executor is None and executor._shutdown
+        space.step(0.1)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            with Space(executor=executor) as space:
+                assert space._threads == 3
+            assert space.executor is executor and not executor._shutdown
+
+
+class TestRunAsync:
+    def test_fixed_rate(self, space):
+        body = space.add_circle(1, (0, 0), vel=(1, 0))
+        ticks = []
+
+        async def on_tick(space, tick):
+            ticks.append((tick, space.time, body.position.x))
+
+        async def main():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            count = await space.run_async(0.5, tick_rate=100, ticks=4, on_tick=on_tick)
+            return count, loop.time() - start
+
+        count, elapsed = asyncio.run(main())
+        assert count == 4
+        assert ticks == [(1, 0.5, 0.5), (2, 1.0, 1.0), (3, 1.5, 1.5), (4, 2.0, 2.0)]
+        assert elapsed >= 0.029
+
+    def test_cancel(self, space):
+        snapshots = []
+
+        async def main():
+            task = asyncio.create_task(
+                space.run_async(
+                    0.1, on_tick=lambda s, t: snapshots.append(s.snapshot())
+                )
+            )
+            await asyncio.sleep(0.25)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert 2 <= len(snapshots) <= 4
+        # O cancelamento pode ocorrer durante um passo, antes de on_tick.
+        assert round(space.time / 0.1) - len(snapshots) in (0, 1)
+
+
+class TestDraw:
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = []
+        for name in ["circ", "rect", "pset", "tri"]:
+            func = lambda *args, name=name: calls.append((name, *args))
+            monkeypatch.setattr(f"pytaon.backend.{name}", func, raising=False)
+        monkeypatch.setattr("pytaon.backend.width", 100, raising=False)
+        monkeypatch.setattr("pytaon.backend.height", 50, raising=False)
+        return calls
+
+    def test_culling(self, space, calls):
+        space.add_circle(2, (10, 10), color=1)
+        space.add_circle(2, (150, 10), color=2)
+        space.add_aabb(90, 40, 120, 60, color=3, body_type=Body.STATIC)
+        space.add_circle(3, (0, 0), color=4)
+        space.draw()
+        assert calls == [
+            ("rect", 90, 40, 30, 20, 3),
+            ("circ", 10, 10, 2, 1),
+            ("circ", 0, 0, 3, 4),
+        ]
+
+        calls.clear()
+        space.draw(view=(140, 0, 160, 20))
+        assert calls == [("circ", 150, 10, 2, 2)]
+        calls.clear()
+        space.draw(cull=False)
+        assert len(calls) == 4
+
+    def test_static_commands_are_cached(self, space, calls):
+        wall = space.add_aabb(0, 0, 10, 10, color=1, body_type=Body.STATIC)
+        commands = space.renderer.commands((0, 0, 100, 50))
+        assert space.renderer.commands((0, 0, 100, 50))[0] is commands[0]
+
+        wall.color = 2
+        floor = space.add_aabb(0, -5, 100, 0, color=3, body_type=Body.STATIC)
+        space.draw()
+        assert calls == [("rect", 0, 0, 10, 10, 2), ("rect", 0, -5, 100, 5, 3)]
+        space.remove(floor)
+        calls.clear()
+        space.draw()
+        assert calls == [("rect", 0, 0, 10, 10, 2)]
+
+        # Mudanças de cor e posição não exigem invalidate().
+        wall.color = 4
+        space.draw()
+        wall.right = 20
+        space.draw()
+        snapshot = space.snapshot()
+        wall.left, wall.right = 50, 60
+        space.reindex_static()
+        space.draw()
+        space.restore(snapshot)
+        space.draw()
+        assert calls[1:] == [
+            ("rect", 0, 0, 10, 10, 4),
+            ("rect", 0, 0, 20, 10, 4),
+            ("rect", 50, 0, 10, 10, 4),
+            ("rect", 0, 0, 20, 10, 4),
+        ]
+        assert space.point_query((15, 5)) == [wall]
+
+    def test_subclass_draw(self, space, calls):
+        class Marker(Circle):
+            def draw(self):
+                pyxel.pset(*self.position, self.color)
+
+        space.add(Marker(1, (5, 5), color=9))
+        space.draw()
+        assert calls == [("pset", 5, 5, 9)]
+
+
+class TestCollisionHandlers:
+    def test_default_handler(self, space):
+        seen = []
+        space.add_default_collision_handler(post_solve=seen.append)
+        space.add_circle(1, (0, 0))
+        space.add_circle(1, (1, 0))
+        space.step(0.1)
+        assert len(seen) == 1
+
+    def test_specific_handler_orders_bodies(self, space):
+        seen = []
+        space.add_collision_handler(AABB, Circle, pre_solve=seen.append)
+        circle = space.add_circle(1, (0, 0), vel=(1, 1))
+        box = space.add_aabb(0, -1, 2, 1)
+        space.step(0.1)
+        assert [col.bodies for col in seen] == [[box, circle]]
+        assert circle.velocity == (1, 1)
+
+    def test_wildcard_handler(self, space):
+        seen = []
+        space.add_wildcard_collision_handler(AABB, pre_solve=seen.append)
+        space.add_circle(1, (0, 0))
+        box = space.add_aabb(0, -1, 2, 1)
+        space.add_circle(1, (10, 10))
+        space.add_circle(1, (11, 10))
+        space.step(0.1)
+        assert [col.body_a for col in seen] == [box]
+
+
+class TestCollisionPool:
+    def test_collisions_are_reused(self, space):
+        space.add_circle(1, (0, 0))
+        space.add_circle(1, (1, 0))
+        (col,) = space.get_collisions()
+        (again,) = space.get_collisions()
+        assert col is again
+
+    def test_copy_survives_the_step(self, space):
+        kept = []
+        space.add_default_collision_handler(post_solve=lambda c: kept.append(c.copy()))
+        a = space.add_circle(1, (0, 0))
+        b = space.add_circle(1, (1, 0))
+        space.step(0.1)
+        a.position_x, b.position_x = 50, 60
+        space.add_circle(1, (100, 0))
+        space.add_circle(1, (101, 0))
+        space.step(0.1)
+        assert set(kept[0].bodies) == {a, b}
+        assert kept[0] not in space.get_collisions()
+
+    def test_collision_outside_step_is_not_pooled(self):
+        a, b = Circle(1, (0, 0)), Circle(1, (1, 0))
+        assert a.get_collision(b) is not a.get_collision(b)
+
+
+class TestPointQuery:
+    def test_point_query_shapes(self, space):
+        circle = space.add_circle(2, (0, 0))
+        box = space.add_aabb(1, 1, 4, 3)
+        poly = space.add_poly([(10, 10), (14, 10), (10, 14)])
+        segment = space.add_segment((20, 0), (30, 0), 1)
+
+        assert space.point_query((1.5, 1.5)) == [box]
+        assert set(space.point_query((1.2, 1.2))) == {circle, box}
+        assert space.point_query((11, 11)) == [poly]
+        assert space.point_query((13, 13)) == []
+        assert space.point_query((25, 0.5)) == [segment]
+        assert space.point_query((100, 100)) == []
+
+    def test_point_query_follows_simulation(self, space):
+        circle = space.add_circle(1, (0, 0), vel=(100, 0))
+        space.step(1)
+        assert space.point_query((0, 0)) == []
+        assert space.point_query((100, 0)) == [circle]
+
+    def test_reindex_after_direct_move(self, space):
+        circle = space.add_circle(1, (0, 0))
+        circle.position_x = 100
+        space.reindex()
+        assert space.point_query((100, 0)) == [circle]
+
+
+class TestSegmentQuery:
+    def test_segment_query_shapes(self, space):
+        circle = space.add_circle(2, (10, 0))
+        box = space.add_aabb(20, -1, 22, 1)
+        poly = space.add_poly([(40, -1), (42, -1), (42, 1), (40, 1)])
+        segment = space.add_segment((50, -5), (50, 5), 1)
+        space.add_circle(1, (10, 10))
+
+        hits = space.segment_query((0, 0), (100, 0))
+        assert [info.body for info in hits] == [circle, box, poly, segment]
+        assert [info.point.x for info in hits] == [8, 20, 40, 49]
+        assert [tuple(info.normal) for info in hits] == [(-1, 0)] * 4
+        assert hits[0].alpha == 0.08
+
+    def test_segment_query_with_radius(self, space):
+        circle = space.add_circle(1, (10, 2))
+        assert space.segment_query((0, 0), (20, 0)) == []
+        (info,) = space.segment_query((0, 0), (20, 0), radius=1.5)
+        assert info.body is circle
+
+    def test_ray_cast_first(self, space):
+        space.add_circle(1, (300, 0))
+        near = space.add_aabb(100, -1, 102, 1)
+        space.add_aabb(-50, -1, -40, 1)
+        info = space.ray_cast_first((0, 0), (500, 0))
+        assert info.body is near
+        assert info.point == (100, 0)
+        assert space.ray_cast_first((0, 10), (500, 10)) is None
+
+    def test_ray_cast_first_finds_body_spanning_cells(self, space):
+        space.add_circle(1, (50, 0))
+        wall = space.add_aabb(5, -100, 6, 100)
+        assert space.ray_cast_first((0, 70), (100, -70)).body is wall
+
+
+class TestRegionQueries:
+    def test_bb_query(self, space):
+        a = space.add_circle(1, (0, 0))
+        b = space.add_aabb(10, 10, 100, 20)
+        space.add_circle(1, (-50, 50))
+        assert set(space.bb_query(0, 0, 50, 50)) == {a, b}
+        assert space.bb_query(90, 15, 95, 16) == [b]
+        assert space.bb_query(200, 200, 300, 300) == []
+
+    def test_bb_query_reuses_output_list(self, space):
+        space.add_circle(1, (0, 0))
+        out = ["stale"]
+        assert space.bb_query(-1, -1, 1, 1, out=out) is out
+        assert len(out) == 1
+
+    def test_nearest(self, space):
+        a = space.add_circle(1, (0, 0))
+        b = space.add_circle(1, (10, 0))
+        c = space.add_circle(1, (200, 0))
+        assert space.nearest((4, 0)) == [a]
+        assert space.nearest((8, 0), k=2) == [b, a]
+        assert space.nearest((8, 0), k=5) == [b, a, c]
+        assert space.nearest((150, 0), k=3, max_distance=140) == [c, b]
+
+    def test_nearest_static(self, space):
+        circle = space.add_circle(1, (100, 100))
+        wall = space.add_aabb(0, 0, 2, 2, body_type=Body.STATIC)
+        assert space.nearest((1, 1)) == [wall]
+        assert space.nearest((99, 99)) == [circle]
+        assert space.nearest((1, 1), k=2) == [wall, circle]
+
+    def test_nearest_matches_brute_force(self, space):
+        rng = random.Random(3)
+        for _ in range(200):
+            pos = (rng.uniform(-200, 200), rng.uniform(-200, 200))
+            space.add_circle(rng.uniform(0.5, 8), pos)
+        for _ in range(50):
+            x, y = rng.uniform(-200, 200), rng.uniform(-200, 200)
+            space.add_aabb(x, y, x + rng.uniform(1, 20), y + 2, body_type=Body.STATIC)
+
+        def dist(body, x, y):
+            dx = max(body.left - x, 0, x - body.right)
+            dy = max(body.bottom - y, 0, y - body.top)
+            return (dx * dx + dy * dy) ** 0.5
+
+        for _ in range(50):
+            x, y = rng.uniform(-300, 300), rng.uniform(-300, 300)
+            result = [dist(body, x, y) for body in space.nearest((x, y), k=5)]
+            expected = sorted(dist(body, x, y) for body in space.bodies)[:5]
+            assert result == pytest.approx(expected)
+
+
+class TestPointQueryMany:
+    def test_csr_output(self, space):
+        space.add_circle(2, (0, 0))
+        space.add_aabb(1, 1, 4, 3)
+        space.add_poly([(10, 10), (14, 10), (10, 14)])
+        space.add_segment((20, 0), (30, 0), 1)
+        points = [(1.2, 1.2), (100, 100), (11, 11), (25, 0.5), (1.5, 1.5)]
+
+        offsets, indices = space.point_query_many(points)
+        assert list(offsets) == [0, 2, 2, 3, 4, 5]
+        assert list(indices) == [0, 1, 2, 3, 1]
+
+    def test_matches_point_query(self, space):
+        rng = random.Random(2)
+        for _ in range(300):
+            x, y = rng.uniform(0, 200), rng.uniform(0, 200)
+            if rng.random() < 0.5:
+                space.add_circle(rng.uniform(1, 8), (x, y))
+            else:
+                space.add_aabb(x, y, x + rng.uniform(1, 10), y + rng.uniform(1, 10))
+        points = [(rng.uniform(0, 200), rng.uniform(0, 200)) for _ in range(500)]
+
+        offsets, indices = space.point_query_many(points)
+        ids = {body: i for i, body in enumerate(space.bodies)}
+        for n, point in enumerate(points):
+            expected = sorted(ids[body] for body in space.point_query(point))
+            assert list(indices[offsets[n] : offsets[n + 1]]) == expected
+
+    def test_empty(self, space):
+        offsets, indices = space.point_query_many([])
+        assert list(offsets) == [0] and list(indices) == []
+
+
+class TestMargins:
+    def test_all_margins_reflect_velocity(self):
+        space = Space(margin_left=0, margin_right=100, margin_bottom=0, margin_top=100)
+        left = space.add_circle(1, (0.5, 50), vel=(-10, 0))
+        right = space.add_circle(1, (99.5, 50), vel=(10, 0))
+        bottom = space.add_circle(1, (50, 0.5), vel=(0, -10))
+        top = space.add_aabb(40, 98, 42, 100, vel=(0, 10))
+        inside = space.add_circle(1, (70, 70), vel=(10, 10))
+        space.step(0.01)
+        assert left.velocity == (10, 0)
+        assert right.velocity == (-10, 0)
+        assert bottom.velocity == (0, 10)
+        assert top.velocity == (0, -10)
+        assert inside.velocity == (10, 10)
+
+    def test_restitution(self):
+        space = Space(margin_left=0, restitution=0.5)
+        a = space.add_circle(1, (0.5, 0), vel=(-10, 0))
+        b = space.add_circle(1, (0.5, 10), vel=(-10, 0), restitution=1.0)
+        space.step(0.01)
+        assert a.velocity == (5, 0)
+        assert b.velocity == (10, 0)
+
+    def test_body_moving_inwards_is_not_reflected(self):
+        space = Space(margin_left=0)
+        a = space.add_circle(1, (0.5, 0), vel=(10, 0))
+        space.step(0.01)
+        assert a.velocity == (10, 0)
+
+
+class TestPeriodic:
+    @pytest.fixture
+    def periodic(self):
+        return Space(
+            margin_left=0,
+            margin_right=100,
+            margin_bottom=0,
+            margin_top=60,
+            periodic=True,
+        )
+
+    def test_requires_margins(self):
+        with pytest.raises(ValueError):
+            Space(margin_left=0, periodic=True)
+
+    def test_wrap_around(self, periodic):
+        a = periodic.add_circle(1, (99, 30), vel=(200, -40))
+        b = periodic.add_aabb(1, 1, 3, 3, vel=(-300, 0))
+        periodic.step(0.01)
+        assert a.position.x == pytest.approx(1)
+        assert a.position.y == pytest.approx(29.6)
+        assert b.position_x == pytest.approx(99)
+
+    def test_static_bodies(self, periodic):
+        a = periodic.add_aabb(45, 45, 55, 55, vel=(0, -10))
+        periodic.add_aabb(40, 30, 60, 46, body_type=Body.STATIC)
+        periodic.step(0.1)
+        assert a.velocity == (0, 10)
+
+    def test_bb_query_with_offset_period(self):
+        space = Space(
+            margin_left=-100,
+            margin_right=100,
+            margin_bottom=-100,
+            margin_top=100,
+            periodic=True,
+        )
+        bodies = [space.add_circle(2, (x, 0)) for x in (-90, -50, 50, 90)]
+        assert set(space.bb_query(-100, -100, 100, 100)) == set(bodies)
+        assert space.bb_query(-95, -5, -45, 5) == bodies[:2]
+
+    def test_minimum_image_collisions(self, periodic):
+        a = periodic.add_circle(2, (1, 30))
+        b = periodic.add_circle(2, (98.5, 30))
+        periodic.add_circle(2, (50, 59))
+        periodic.add_circle(2, (50, 1))
+        pairs = [set(col.bodies) for col in periodic.get_collisions()]
+        assert len(pairs) == 2
+        assert {a, b} in pairs
+        assert b.position.x == 98.5